@@ -1,114 +1,241 @@
+import hashlib
 import streamlit as st
-import pandas as pd
-from google.oauth2.service_account import Credentials # <-- Correcta
 import plotly.express as px
-import re
-import gspread
-# La línea de oauth2client se eliminó
-from io import StringIO
+import instrument
+import reports
+from config import SHEET_ID, SHEET_NAME, SNAPSHOT_DIR
+from dataset import prepare_dataset
+from downloads import COMPRESSIONS, csv_export, download_name, mime_type
+from filters import filter_frame, filter_options
+from identities import IdentityIndex
+from instrument import stage
+from partitions import PartitionedSource, combine
+from refresher import DatasetRefresher, build_if_changed
+from sources import REPORT_COLUMNS, FileSource, GoogleClient, GoogleSheetSource
+from sqlengine import DuckDBEngine
 
 # ---------------- CONFIG ----------------
-SHEET_ID = "16PzfegYvX0ywjOZ0zh3MS9-xxNBNugeMeXGLDqykQRs"
-SHEET_NAME = "Respuestas de formulario 1"
+# "gsheets": la hoja de Google (requiere los Secrets). "file": un CSV/Parquet local en DATA_FILE,
+# por ejemplo uno generado con `python synthetic.py`.
+DATA_SOURCE = "gsheets"
+DATA_FILE = ".cache/respuestas.parquet"
+# La hoja (SHEET_ID, SHEET_NAME) y su snapshot local (SNAPSHOT_DIR) están en config.py, compartidos
+# con export.py.
+# "incremental": solo descarga las filas nuevas y las agrega al snapshot local.
+# "full": descarga toda la hoja en cada refresco (comportamiento original).
+SYNC_MODE = "incremental"
+# Columnas que se descargan de la hoja (una sola llamada, solo esos rangos). None: todas.
+SHEET_COLUMNS = REPORT_COLUMNS
+# Índice de dinamizadores (cédula canónica -> ID estable y nombre); en cada carga solo se
+# procesan las filas nuevas. Ver identities.py.
+IDENTITY_DIR = ".cache/identidades"
+# Una hoja por año: {año: (id de la hoja, pestaña)}, o {año: archivo} con DATA_SOURCE = "file".
+# Las de años cerrados se leen una sola vez y se conservan (snapshot en SNAPSHOT_DIR/<año>); solo
+# se vuelve a consultar la del año más reciente. Los años que no se eligen en el filtro "Año" no
+# se leen. Vacío: una sola hoja (SHEET_ID/SHEET_NAME o DATA_FILE) con todos los años.
+PARTITIONS = {}
+# "lazy": solo se calcula la sección elegida y sus controles recargan solo esa sección.
+# "tabs": las cuatro pestañas se calculan en cada interacción (comportamiento original).
+RENDER_MODE = "lazy"
+# Cada cuántos segundos el hilo de fondo vuelve a leer la hoja.
+REFRESH_SECONDS = 300
+# Cuánto espera "Actualizar" a que termine la recarga antes de seguir con los datos vigentes.
+REFRESH_WAIT_SECONDS = 60
+# "pandas": las tablas de Dinamizadores, Top e Infoplazas se calculan con pandas.
+# "duckdb": con consultas SQL en DuckDB (requiere `pip install duckdb`), en varios hilos
+# (QUERY_THREADS; None = todos los núcleos). Mismos resultados; ver bench/bench_engines.py.
+QUERY_ENGINE = "pandas"
+QUERY_THREADS = None
+# True: mide cada etapa, muestra el panel "⏱ Rendimiento" en la barra lateral y escribe
+# líneas JSON en .cache/perf.jsonl. También se activa con la variable de entorno INFORME_PERF=1.
+PERF_PANEL = False
+# Selecciones de filtros cuyas filas filtradas se conservan, compartidas por todas las sesiones
+# (se descartan las menos usadas recientemente).
+FILTER_CACHE_ENTRIES = 16
+# Filas por página en la tabla de "Participación por Infoplazas".
+INFOPLAZAS_PAGE_SIZE = 25
 
 st.set_page_config(page_title="Informe Dinamizadores", layout="wide")
+if PERF_PANEL:
+    instrument.configure(enabled=True)
 
 # ---------------- HELPERS ----------------
-def normalize_cedula(ced):
-    if pd.isna(ced): 
-        return None
-    ced = re.sub(r"[^0-9]", "-", str(ced))
-    ced = re.sub(r"-+", "-", ced)
-    return ced.strip("-")
-
-def unify_dinamizadores(df, col_cedula, col_nombre):
-    df["_cedula_norm"] = df[col_cedula].apply(normalize_cedula)
-    name_map = {}
-    for i, row in df.iterrows():
-        ced = row["_cedula_norm"]
-        if ced and ced not in name_map:
-            name_map[ced] = row[col_nombre]
-    df["_nombre_unificado"] = df["_cedula_norm"].map(name_map)
-    return df
-
-def load_sheet():
+def make_source():
+    """La fuente de datos configurada; se crea una sola vez y se autoriza al primer uso."""
+    if DATA_SOURCE == "file":
+        return FileSource(DATA_FILE)
+    # Credenciales desde los Secrets de Streamlit
+    return GoogleSheetSource(
+        st.secrets["gcp_service_account"], SHEET_ID, SHEET_NAME,
+        sync_mode=SYNC_MODE, snapshot_dir=SNAPSHOT_DIR, columns=SHEET_COLUMNS,
+    )
+
+@st.cache_resource
+def get_identities():
+    # Un solo índice por proceso, compartido por el refrescador y todas las sesiones.
+    return IdentityIndex(IDENTITY_DIR)
+
+def make_partitions():
+    """Una fuente por año de PARTITIONS; las hojas de Google comparten un solo cliente autorizado."""
+    if DATA_SOURCE == "file":
+        return PartitionedSource({año: FileSource(path) for año, path in PARTITIONS.items()}, REFRESH_SECONDS)
+    client = GoogleClient(st.secrets["gcp_service_account"])
+    current = max(PARTITIONS)
+    sources = {
+        año: GoogleSheetSource(
+            client.credentials_info, sheet_id, sheet_name,
+            # Los años cerrados no cambian: se usa su snapshot sin consultar la hoja.
+            sync_mode=SYNC_MODE if año == current else "frozen",
+            snapshot_dir=f"{SNAPSHOT_DIR}/{año}", client=client, columns=SHEET_COLUMNS,
+        )
+        for año, (sheet_id, sheet_name) in PARTITIONS.items()
+    }
+    return PartitionedSource(sources, REFRESH_SECONDS, current=current)
+
+@st.cache_resource
+def get_refresher():
+    # Un único refrescador por proceso, compartido por todas las sesiones.
+    if PARTITIONS:
+        return make_partitions()
+    # La fuente (y su cliente de Google) se crea una vez; cada refresco solo la vuelve a leer.
+    source, identities = make_source(), get_identities()
+    # Si la hoja no trajo filas nuevas no se vuelve a preparar ni cambia la versión (y sus cachés).
+    return DatasetRefresher(
+        build_if_changed(source, lambda df: prepare_dataset(df, identities)), REFRESH_SECONDS,
+    )
+
+@st.cache_resource(max_entries=4)
+def prepared_partitions(years, version, _frames):
+    # Compartido por las sesiones que eligen los mismos años, hasta que cambie el año en curso.
+    # Cada año es una hoja del índice de dinamizadores: las de años cerrados no se vuelven a recorrer.
+    streams = [(str(año), len(frame)) for año, frame in _frames.items() if len(frame.columns)]
+    return prepare_dataset(combine(list(_frames.values())), get_identities(), streams)
+
+def partitioned_dataset(partitions, years):
+    version, frames = partitions.load(years)
+    # Los años forman parte de la versión: cada combinación es un conjunto de datos distinto.
+    return (years, version), prepared_partitions(years, version, frames)
+
+@st.cache_resource(max_entries=2)
+def sql_engine(_df, _filter_index, version):
+    # Una tabla de DuckDB por versión de los datos, compartida por todas las sesiones.
+    with stage("sql_engine", rows_in=len(_df)):
+        return DuckDBEngine(_df, _filter_index, threads=QUERY_THREADS)
+
+def show_load_error(e):
+    if DATA_SOURCE == "file":
+        st.error(f"Error al leer {DATA_FILE}: {e}")
+        return
+    st.error(f"Error al conectar con Google Sheets: {e}")
+    st.warning("Verifica que los 'Secrets' estén bien configurados en el panel de Streamlit.")
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+def filtered(_df, _filter_index, version, selection_key):
+    # Un solo resultado por selección para todas las sesiones y secciones; sin filtros es el propio
+    # conjunto de datos. Ningún cálculo los modifica (y con copy-on-write no podrían alterarlo).
+    with stage("filter", rows_in=len(_df)) as s:
+        df_f = filter_frame(_df, _filter_index, dict(selection_key))
+        s.rows_out = len(df_f)
+    return df_f
+
+def bar_chart(name, data, **kwargs):
+    with stage(f"chart:{name}", rows_in=len(data)):
+        st.plotly_chart(px.bar(data, **kwargs), width="stretch")
+
+def export_button(label, table, file_name, encoding="utf-8"):
     """
-    Se conecta a Google Sheets usando los Secrets de Streamlit, 
-    abre la hoja correcta y la devuelve como un DataFrame.
+    Botón de descarga que escribe el CSV solo al pulsarlo, por bloques y en caché
+    según el contenido de la tabla. Ver downloads.py.
     """
-    try:
-        # Carga las credenciales desde los Secrets de Streamlit
-        creds = Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"],
-            scopes=[
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive"
-            ],
-        )
-        # Autoriza y se conecta a gspread
-        client = gspread.authorize(creds)
-        
-        # Abre la hoja por ID y nombre y la convierte a DataFrame
-        ws = client.open_by_key(SHEET_ID).worksheet(SHEET_NAME)
-        data = ws.get_all_values()
-        df = pd.DataFrame(data[1:], columns=data[0])
-        return df
-        
-    except Exception as e:
-        st.error(f"Error al conectar con Google Sheets: {e}")
-        st.warning("Verifica que los 'Secrets' estén bien configurados en el panel de Streamlit.")
-        return pd.DataFrame() # Devuelve un DataFrame vacío si hay error
-
-@st.cache_data(ttl=300)
-def get_data():
-    df = load_sheet()
-    # Normalizaciones
-    df = unify_dinamizadores(df, "Cédula", "Nombre y apellido")
-    # Año numérico
-    if "Año" in df.columns:
-        df["Año"] = pd.to_numeric(df["Año"], errors="coerce")
-    return df
-
-def clean_filter_options(series):
-    return sorted([x for x in series.dropna().unique() if str(x).strip() not in ["", "Agregar al listado"]])
+    compression = st.session_state.get("export_compression", "none")
+
+    def data():
+        return csv_export(table, file_name, compression, encoding).read_bytes()
+
+    st.download_button(
+        label, data, download_name(file_name, compression), mime_type(compression), on_click="ignore",
+    )
 
 # ---------------- MAIN APP ----------------
 st.title("📊 Informe de Asistencia Dinamizadores")
 
+try:
+    refresher = get_refresher()
+except Exception as e:
+    show_load_error(e)
+    st.stop()
 if st.sidebar.button("🔄 Actualizar"):
-    st.cache_data.clear()
+    # Solo recarga este conjunto de datos; los demás cachés y sesiones no se tocan.
+    with st.spinner("Actualizando datos..."):
+        refresher.refresh(REFRESH_WAIT_SECONDS)
 
-df = get_data()
+st.sidebar.header("Filtros")
+if PARTITIONS:
+    # Los años salen de la configuración: se eligen antes de leer nada.
+    años = refresher.years()
+    sel_años = st.sidebar.multiselect("Año", años, default=años)
+    if not sel_años:
+        st.info("Elige al menos un año.")
+        st.stop()
+
+try:
+    # `version` identifica la carga en la clave de los cálculos memoizados por sección.
+    if PARTITIONS:
+        version, (df, filter_index, cube) = partitioned_dataset(refresher, tuple(sel_años))
+    else:
+        version, (df, filter_index, cube) = refresher.get()
+except Exception as e:
+    show_load_error(e)
+    st.stop()
+if refresher.last_error is not None:
+    show_load_error(refresher.last_error)
+    st.caption("Se muestran los últimos datos cargados correctamente.")
 
 # ---------------- FILTERS ----------------
-años = clean_filter_options(df["Año"]) if "Año" in df else []
-meses = clean_filter_options(df["Mes"]) if "Mes" in df else []
-regs = clean_filter_options(df["Regional"]) if "Regional" in df else []
-provs = clean_filter_options(df["Provincia"]) if "Provincia" in df else []
-facs = clean_filter_options(df["Facilitador"]) if "Facilitador" in df else []
+if PARTITIONS:
+    # Solo se cargaron los años elegidos; el filtro "Año" solo recorre filas si alguna hoja trae otros.
+    sel_años = [a for a in filter_options(filter_index, "Año") if a in sel_años] or sel_años
+else:
+    años = filter_options(filter_index, "Año")
+    sel_años = st.sidebar.multiselect("Año", años, default=años)
+meses = filter_options(filter_index, "Mes")
+regs = filter_options(filter_index, "Regional")
+provs = filter_options(filter_index, "Provincia")
+facs = filter_options(filter_index, "Facilitador")
 
-st.sidebar.header("Filtros")
-sel_años = st.sidebar.multiselect("Año", años, default=años)
 sel_meses = st.sidebar.multiselect("Mes", meses, default=meses)
 sel_reg = st.sidebar.multiselect("Regional", regs, default=regs)
 sel_prov = st.sidebar.multiselect("Provincia", provs, default=provs)
 sel_fac = st.sidebar.multiselect("Facilitador", facs, default=facs)
+st.sidebar.selectbox(
+    "Formato de descargas", list(COMPRESSIONS), key="export_compression",
+    format_func={"none": "CSV", "gzip": "CSV comprimido (.gz)", "zip": "ZIP"}.get,
+)
 
-df_f = df.copy()
-if sel_años: df_f = df_f[df_f["Año"].isin(sel_años)]
-if sel_meses: df_f = df_f[df_f["Mes"].isin(sel_meses)]
-if sel_reg: df_f = df_f[df_f["Regional"].isin(sel_reg)]
-if sel_prov: df_f = df_f[df_f["Provincia"].isin(sel_prov)]
-if sel_fac: df_f = df_f[df_f["Facilitador"].isin(sel_fac)]
+selections = {
+    "Año": sel_años, "Mes": sel_meses, "Regional": sel_reg,
+    "Provincia": sel_prov, "Facilitador": sel_fac,
+}
+# Versión hashable de la selección: es la clave de los cálculos memoizados de cada sección.
+selection_key = tuple((col, tuple(values)) for col, values in selections.items())
 
-# ---------------- TABS ----------------
-tabs = st.tabs(["📈 KPI", "👥 Dinamizadores", "⭐ Top Dinamizadores", "🏢 Participación por Infoplazas"])
+# ---------------- SECTIONS ----------------
+# Cada sección separa su cálculo (memoizado con la versión de los datos, la selección de
+# filtros y sus propios controles) del renderizado, que es un fragmento: mover un control
+# de una sección solo vuelve a ejecutar esa sección. Los resultados se comparten entre
+# sesiones sin copiarlos (cache_resource): el renderizado nunca los modifica.
 
 # ---- KPI ----
-with tabs[0]:
+@st.cache_resource(ttl=300, max_entries=32)
+def kpi_data(_cube, version, selection_key):
+    with stage("agg:kpi"):
+        return reports.kpi_data(_cube, dict(selection_key))
+
+def render_kpi():
+    kpis, charts = kpi_data(cube, version, selection_key)
     st.subheader("Sección 1: Datos completos")
-    total_registros = len(df_f)
-    sesiones_unicas = df_f["CountSesión"].nunique() if "CountSesión" in df_f else 0
+    total_registros = kpis["total_registros"]
+    sesiones_unicas = kpis["sesiones_unicas"]
     prom_particip = total_registros / sesiones_unicas if sesiones_unicas > 0 else 0
     c1,c2,c3 = st.columns(3)
     c1.metric("Total registros", f"{total_registros:,}")
@@ -116,42 +243,41 @@ with tabs[0]:
     c3.metric("Promedio participación/sesión", f"{prom_particip:,.2f}")
     
     st.subheader("Sección 2: Datos únicos")
-    din_uniq = df_f["_cedula_norm"].nunique()
-    inf_uniq = df_f["#"].nunique() if "#" in df_f else 0
-    temas_uniq = df_f["Tema"].nunique() if "Tema" in df_f else 0
     c1,c2,c3 = st.columns(3)
-    c1.metric("Dinamizadores únicos", f"{din_uniq:,}")
-    c2.metric("Infoplazas únicas", f"{inf_uniq:,}")
-    c3.metric("Temas únicos", f"{temas_uniq:,}")
+    c1.metric("Dinamizadores únicos", f"{kpis['din_uniq']:,}")
+    c2.metric("Infoplazas únicas", f"{kpis['inf_uniq']:,}")
+    c3.metric("Temas únicos", f"{kpis['temas_uniq']:,}")
     
     st.markdown("---")
     st.subheader("Gráficos")
-    if "Mes" in df_f:
-        g1 = df_f.groupby(["Año","Mes"])["CountSesión"].nunique().reset_index(name="Sesiones")
-        st.plotly_chart(px.bar(g1, x="Mes", y="Sesiones", color="Año", barmode="group"), use_container_width=True)
-    if "Mes" in df_f:
-        g2 = df_f.groupby(["Año","Mes"])["_cedula_norm"].nunique().reset_index(name="Dinamizadores")
-        st.plotly_chart(px.bar(g2, x="Mes", y="Dinamizadores", color="Año", barmode="group"), use_container_width=True)
-    if "Regional" in df_f:
-        g3 = df_f.groupby("Regional")["_cedula_norm"].nunique().reset_index(name="Dinamizadores")
-        st.plotly_chart(px.bar(g3, x="Regional", y="Dinamizadores"), use_container_width=True)
-    if "Provincia" in df_f:
-        g4 = df_f.groupby("Provincia")["_cedula_norm"].nunique().reset_index(name="Dinamizadores")
-        st.plotly_chart(px.bar(g4, x="Provincia", y="Dinamizadores"), use_container_width=True)
+    if "g1" in charts:
+        bar_chart("sesiones_mes", charts["g1"], x="Mes", y="Sesiones", color="Año", barmode="group")
+    if "g2" in charts:
+        bar_chart("dinamizadores_mes", charts["g2"], x="Mes", y="Dinamizadores", color="Año", barmode="group")
+    if "g3" in charts:
+        bar_chart("dinamizadores_regional", charts["g3"], x="Regional", y="Dinamizadores")
+    if "g4" in charts:
+        bar_chart("dinamizadores_provincia", charts["g4"], x="Provincia", y="Dinamizadores")
 
 # ---- Dinamizadores ----
+@st.cache_resource(ttl=300, max_entries=32)
+def dinamizadores_table(_df, _filter_index, version, selection_key):
+    if QUERY_ENGINE == "duckdb":
+        with stage("agg:dinamizadores") as s:
+            tabla = sql_engine(_df, _filter_index, version).dinamizadores_table(dict(selection_key))
+            s.rows_out = len(tabla)
+        return tabla
+    df_f = filtered(_df, _filter_index, version, selection_key)
+    with stage("agg:dinamizadores", rows_in=len(df_f)) as s:
+        tabla = reports.dinamizadores_table(df_f)
+        s.rows_out = len(tabla)
+    return tabla
 
-with tabs[1]:
+@st.fragment
+def render_dinamizadores():
     st.subheader("Listado de Dinamizadores")
-    if "_cedula_norm" in df_f:
-        df_f["InfoplazaFull"] = df_f["#"].astype(str) + " - " + df_f["INFOPLAZAS"]
-
-        tabla = df_f.sort_values("Marca temporal").groupby("_cedula_norm").agg(
-            Nombre=("_nombre_unificado", "first"),
-            Infoplaza=("InfoplazaFull", "first"),
-            Participaciones=("CountSesión", "count"),
-            TemasUnicos=("Tema", "nunique")
-        ).reset_index().rename(columns={"_cedula_norm": "Cédula"})
+    if "_cedula_norm" in df:
+        tabla = dinamizadores_table(df, filter_index, version, selection_key)
         inf_opts = sorted(tabla["Infoplaza"].dropna().unique())
         sel_inf = st.selectbox("Filtrar por Infoplaza", ["Todos"] + inf_opts)
         if sel_inf != "Todos":
@@ -159,110 +285,141 @@ with tabs[1]:
 
         st.dataframe(tabla)
 
-        csv = tabla.to_csv(index=False).encode("utf-8")
-        st.download_button("⬇️ Exportar CSV", csv, "dinamizadores.csv", "text/csv")
-
+        export_button("⬇️ Exportar CSV", tabla, "dinamizadores.csv")
 
 # ---- Top Dinamizadores ----
-with tabs[2]:
+@st.cache_resource(ttl=300, max_entries=32)
+def top_table(_df, _filter_index, version, selection_key):
+    if QUERY_ENGINE == "duckdb":
+        with stage("agg:top") as s:
+            tabla = sql_engine(_df, _filter_index, version).top_table(dict(selection_key))
+            s.rows_out = len(tabla)
+        return tabla
+    df_f = filtered(_df, _filter_index, version, selection_key)
+    with stage("agg:top", rows_in=len(df_f)) as s:
+        tabla = reports.top_table(df_f)
+        s.rows_out = len(tabla)
+    return tabla
+
+@st.fragment
+def render_top():
     st.subheader("Top Dinamizadores")
-    if "#" in df_f and "Infoplaza" in df.columns:
-        df_f["InfoplazaFull"] = df_f["#"].astype(str) + " - " + df_f["INFOPLAZAS"]
-        tabla = df_f.groupby(["_cedula_norm","_nombre_unificado","InfoplazaFull"]).size().reset_index(name="Participaciones")
-        tabla.rename(columns={"_cedula_norm":"Cédula","_nombre_unificado":"Nombre","InfoplazaFull":"Infoplaza"}, inplace=True)
+    if "#" in df and "Infoplaza" in df.columns:
+        tabla = top_table(df, filter_index, version, selection_key)
         top_n = st.slider("Cantidad",1,20,5)
-        top_tabla = tabla.sort_values("Participaciones", ascending=False).head(top_n)
+        top_tabla = tabla.head(top_n)
         st.dataframe(top_tabla)
-        st.plotly_chart(px.bar(top_tabla, x="Participaciones", y="Nombre", color="Infoplaza", orientation="h"), use_container_width=True)
+        bar_chart("top_dinamizadores", top_tabla, x="Participaciones", y="Nombre", color="Infoplaza", orientation="h")
 
 # ---- Participación por Infoplazas ----
-with tabs[3]:
+@st.cache_resource(ttl=300, max_entries=32)
+def infoplazas_tables(_df, _filter_index, version, selection_key):
+    if QUERY_ENGINE == "duckdb":
+        with stage("agg:infoplazas"):
+            return sql_engine(_df, _filter_index, version).infoplazas_tables(dict(selection_key))
+    df_f = filtered(_df, _filter_index, version, selection_key)
+    with stage("agg:infoplazas", rows_in=len(df_f)):
+        return reports.infoplazas_tables(_df, df_f, dict(selection_key))
+
+@st.fragment
+def render_infoplazas():
     st.subheader("Participación por Infoplazas")
 
     required_cols = ["#", "INFOPLAZAS", "Regional", "Provincia", "CountSesión", "_cedula_norm", "_nombre_unificado"]
-    if all(col in df.columns for col in required_cols) and not df_f.empty:
-        
-        # 1. PREPARACIÓN DE DATOS DE PARTICIPACIÓN (SIN CAMBIOS)
-        df_f["InfoplazaFull"] = df_f["#"].astype(str) + " - " + df_f["INFOPLAZAS"]
-        
-        summary_table = df_f.groupby("InfoplazaFull").agg(
-            TotalSesiones=("CountSesión", "count"),
-            SesionesUnicas=("CountSesión", "nunique"),
-            DinamizadoresUnicos=("_cedula_norm", "nunique")
-        ).reset_index()
-
-        detail_table = df_f.groupby(["InfoplazaFull", "_cedula_norm", "_nombre_unificado"]).agg(
-            TotalParticipacion=("CountSesión", "count"),
-            ParticipacionUnica=("CountSesión", "nunique")
-        ).reset_index().rename(columns={
-            "_cedula_norm": "Cédula", 
-            "_nombre_unificado": "Nombre del Dinamizador"
-        })
-
-        # 2. CATÁLOGO MAESTRO FILTRADO (LÓGICA MEJORADA)
-        # Se crea el catálogo maestro desde el DataFrame original `df` para tener la lista completa.
-        catalogo_maestro = df[["#", "INFOPLAZAS", "Regional", "Provincia"]].drop_duplicates().dropna()
-        
-        # APLICAMOS LOS FILTROS DE LA BARRA LATERAL AL CATÁLOGO MAESTRO.
-        # Esto asegura que la lista de Infoplazas se ajusta a la selección del usuario.
-        if sel_reg:
-            catalogo_maestro = catalogo_maestro[catalogo_maestro["Regional"].isin(sel_reg)]
-        if sel_prov:
-            catalogo_maestro = catalogo_maestro[catalogo_maestro["Provincia"].isin(sel_prov)]
-        
-        catalogo_maestro["InfoplazaFull"] = catalogo_maestro["#"].astype(str) + " - " + catalogo_maestro["INFOPLAZAS"]
-        
-        # 3. UNIÓN FINAL (MERGE)
-        # Se une el catálogo ya filtrado con los datos de participación.
-        final_summary = pd.merge(
-            catalogo_maestro[["InfoplazaFull"]], 
-            summary_table, 
-            on="InfoplazaFull", 
-            how="left"
-        ).fillna(0)
-        
-        for col in ["TotalSesiones", "SesionesUnicas", "DinamizadoresUnicos"]:
-            final_summary[col] = final_summary[col].astype(int)
-
-        # 4. FILTROS DE VISTA Y EXPORTACIÓN (SIN CAMBIOS)
-        show_only = st.checkbox("Mostrar solo infoplazas sin participación")
-        if show_only:
-            display_data = final_summary[final_summary["TotalSesiones"] == 0]
-        else:
-            display_data = final_summary.sort_values("TotalSesiones", ascending=False)
-        
-        csv = display_data.to_csv(index=False).encode("utf-8-sig")
-        st.download_button("⬇️ Exportar Resumen CSV", csv, "resumen_participacion_infoplazas.csv", "text/csv")
-        st.markdown("---")
-
-        # 5. RENDERIZADO DE LA VISTA DESPLEGABLE (SIN CAMBIOS)
-        if display_data.empty:
-            st.info("No hay Infoplazas que coincidan con los filtros de Regional o Provincia seleccionados.")
-        else:
-            detail_table.set_index("InfoplazaFull", inplace=True)
-            
-            for _, row in display_data.iterrows():
-                infoplaza_name = row["InfoplazaFull"]
-                
-                expander_label = (
-                    f"{infoplaza_name} | **Total de Sesiones:** {row['TotalSesiones']} | "
-                    f"**Sesiones Únicas:** {row['SesionesUnicas']} | "
-                    f"**Dinamizadores Únicos:** {row['DinamizadoresUnicos']}"
-                )
-                
-                with st.expander(expander_label):
-                    if row['TotalSesiones'] > 0 and row['DinamizadoresUnicos'] > 0:
-                        try:
-                            dinamizador_details = detail_table.loc[[infoplaza_name]]
-                            st.dataframe(
-                                dinamizador_details[["Cédula", "Nombre del Dinamizador", "TotalParticipacion", "ParticipacionUnica"]].reset_index(drop=True)
-                            )
-                        except KeyError:
-                            st.warning("No se encontraron detalles de dinamizadores para esta infoplaza.")
-                    else:
-                        st.info("Esta infoplaza no registra participación con los filtros actuales.")
+    if not all(col in df.columns for col in required_cols):
+        st.warning("Faltan columnas necesarias en la hoja de Google Sheets para generar este reporte.")
+        return
+
+    tables = infoplazas_tables(df, filter_index, version, selection_key)
+    if tables is None:
+        st.info("No hay datos de participación que coincidan con los filtros seleccionados.")
+        return
+    final_summary, detail_table, detail_positions = tables
+
+    # 4. FILTROS DE VISTA, BÚSQUEDA, ORDEN Y EXPORTACIÓN (en el servidor)
+    show_only = st.checkbox("Mostrar solo infoplazas sin participación")
+    c1, c2, c3 = st.columns([2, 1, 1])
+    search = c1.text_input("Buscar infoplaza")
+    sort_cols = ["TotalSesiones", "SesionesUnicas", "DinamizadoresUnicos", "InfoplazaFull"]
+    sort_col = c2.selectbox("Ordenar por", sort_cols)
+    descending = c3.toggle("Descendente", value=True)
+
+    display_data = final_summary
+    if show_only:
+        display_data = display_data[display_data["TotalSesiones"] == 0]
+    if search:
+        display_data = display_data[display_data["InfoplazaFull"].str.contains(search, case=False, regex=False)]
+    display_data = display_data.sort_values(sort_col, ascending=not descending, kind="stable")
     
-    elif df_f.empty:
-         st.info("No hay datos de participación que coincidan con los filtros seleccionados.")
+    c1, c2 = st.columns(2)
+    with c1:
+        export_button(
+            "⬇️ Exportar Resumen CSV", display_data, "resumen_participacion_infoplazas.csv",
+            encoding="utf-8-sig",
+        )
+    with c2:
+        export_button(
+            "⬇️ Exportar Detalle por Dinamizador CSV", detail_table, "detalle_participacion_infoplazas.csv",
+            encoding="utf-8-sig",
+        )
+    st.markdown("---")
+
+    # 5. TABLA PAGINADA Y DETALLE DE LA INFOPLAZA SELECCIONADA
+    if display_data.empty:
+        st.info("No hay Infoplazas que coincidan con los filtros de Regional o Provincia seleccionados.")
+        return
+
+    pages = (len(display_data) - 1) // INFOPLAZAS_PAGE_SIZE + 1
+    page = st.number_input(f"Página (de {pages})", min_value=1, max_value=pages, value=1)
+    start = (page - 1) * INFOPLAZAS_PAGE_SIZE
+    page_data = display_data.iloc[start:start + INFOPLAZAS_PAGE_SIZE].reset_index(drop=True)
+
+    # La clave cambia con la vista, los filtros y la versión de los datos: el widget solo depende de
+    # la clave, y una selección vieja apuntaría a otra fila (o a una que ya no existe).
+    data_key = hashlib.sha1(repr((version, selection_key)).encode("utf-8")).hexdigest()[:12]
+    event = st.dataframe(
+        page_data,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"infoplazas_{data_key}_{page}_{search}_{sort_col}_{descending}_{show_only}",
+    )
+    selected = [i for i in event.selection.rows if i < len(page_data)]
+    if not selected:
+        st.caption("Selecciona una infoplaza para ver el detalle de sus dinamizadores.")
+        return
+
+    row = page_data.iloc[selected[0]]
+    st.markdown(f"**{row['InfoplazaFull']}**")
+    positions = detail_positions.get(row["InfoplazaFull"])
+    if row["TotalSesiones"] > 0 and row["DinamizadoresUnicos"] > 0 and positions is not None:
+        st.dataframe(
+            detail_table.take(positions)[["Cédula", "Nombre del Dinamizador", "TotalParticipacion", "ParticipacionUnica"]].reset_index(drop=True)
+        )
     else:
-        st.warning("Faltan columnas necesarias en la hoja de Google Sheets para generar este reporte.")
\ No newline at end of file
+        st.info("Esta infoplaza no registra participación con los filtros actuales.")
+
+# ---------------- TABS ----------------
+SECTIONS = {
+    "📈 KPI": render_kpi,
+    "👥 Dinamizadores": render_dinamizadores,
+    "⭐ Top Dinamizadores": render_top,
+    "🏢 Participación por Infoplazas": render_infoplazas,
+}
+
+if RENDER_MODE == "lazy":
+    # st.tabs solo oculta el contenido; con un selector se ejecuta únicamente la sección visible.
+    section = st.radio("Sección", list(SECTIONS), horizontal=True, label_visibility="collapsed")
+    with stage(f"section:{section}"):
+        SECTIONS[section]()
+else:
+    for (section, render), tab in zip(SECTIONS.items(), st.tabs(list(SECTIONS))):
+        with tab, stage(f"section:{section}"):
+            render()
+
+# ---------------- RENDIMIENTO ----------------
+if instrument.enabled():
+    with st.sidebar.expander("⏱ Rendimiento"):
+        st.dataframe(instrument.summary(), hide_index=True)
+        if st.button("Reiniciar mediciones"):
+            instrument.reset()
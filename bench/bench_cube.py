@@ -0,0 +1,70 @@
+"""
+Benchmark de la pestaña KPI sobre el cubo pre-agregado.
+
+Compara el tiempo de los KPIs y los cuatro gráficos calculados desde el cubo
+de `cube.py` (`reports.kpi_data`) con los `nunique`/`groupby` anteriores sobre
+las filas filtradas, con respuestas sintéticas. Que den lo mismo se prueba en
+tests/test_cube.py.
+
+Uso:
+    python bench/bench_cube.py --rows 300000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import reports  # noqa: E402
+from bench_filters import timed  # noqa: E402
+from cube import build_cube  # noqa: E402
+from dataset import prepare_dataset  # noqa: E402
+from filters import filter_frame  # noqa: E402
+from synthetic import MESES, make_responses  # noqa: E402
+
+CHARTS = [
+    ("CountSesión", ["Año", "Mes"], "Sesiones"),
+    ("_dinamizador_id", ["Año", "Mes"], "Dinamizadores"),
+    ("_dinamizador_id", ["Regional"], "Dinamizadores"),
+    ("_dinamizador_id", ["Provincia"], "Dinamizadores"),
+]
+
+
+def legacy_kpis(df_f):
+    kpis = {
+        "registros": len(df_f),
+        "sesiones": df_f["CountSesión"].nunique(),
+        "dinamizadores": df_f["_dinamizador_id"].nunique(),
+        "infoplazas": df_f["#"].nunique(),
+        "temas": df_f["Tema"].nunique(),
+    }
+    charts = [df_f.groupby(by, observed=True)[col].nunique().reset_index(name=label)
+              for col, by, label in CHARTS]
+    return kpis, charts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df, index, _ = prepare_dataset(make_responses(args.rows, seed=args.seed))
+    cube, t_build = timed(lambda: build_cube(df), repeat=1)
+
+    cases = {
+        "todo elegido": {c: e["options"] for c, e in index["columns"].items()},
+        "parcial": {"Año": index["columns"]["Año"]["options"][-1:], "Mes": MESES[:4],
+                    "Regional": index["columns"]["Regional"]["options"][:2]},
+    }
+
+    print(f"filas:          {args.rows:,}")
+    print(f"construir cubo: {t_build * 1000:8.2f} ms (una vez por carga, {len(cube['cells']):,} celdas)")
+    for name, selections in cases.items():
+        _, t_legacy = timed(lambda: legacy_kpis(filter_frame(df, index, selections)), repeat=5)
+        _, t_cube = timed(lambda: reports.kpi_data(cube, selections), repeat=5)
+        print(f"[{name}] anterior: {t_legacy * 1000:8.2f} ms   cubo: {t_cube * 1000:8.2f} ms"
+              f"   ({t_legacy / t_cube:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
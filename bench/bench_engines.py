@@ -0,0 +1,153 @@
+"""
+Benchmark y verificación del motor SQL (`sqlengine.py`) contra `reports.py`.
+
+Con respuestas sintéticas (más algunas celdas vacías o inválidas, como en la
+hoja real) compara, para muchas selecciones al azar de los filtros, que las
+tablas de Dinamizadores, Top e Infoplazas sean idénticas en ambos motores
+(valores, columnas y orden). Luego mide cada tabla con todo elegido y con un
+filtro parcial.
+
+Uso:
+    python bench/bench_engines.py --rows 1000000
+    python bench/bench_engines.py --rows 100000 --checks 200 --threads 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import reports  # noqa: E402
+from dataset import prepare_dataset  # noqa: E402
+from filters import filter_frame  # noqa: E402
+from sqlengine import DuckDBEngine  # noqa: E402
+from synthetic import make_responses  # noqa: E402
+
+
+def dirty(raw, seed=0):
+    """Vacíos e inválidos que la hoja real sí tiene y los datos sintéticos no."""
+    rng = np.random.default_rng(seed)
+    raw = raw.copy()
+    for col, share, value in [("Regional", 0.01, ""), ("Marca temporal", 0.005, ""),
+                              ("Cédula", 0.01, "s/n"), ("Tema", 0.01, "")]:
+        raw.loc[rng.random(len(raw)) < share, col] = value
+    return raw
+
+
+def same_result(a, b):
+    """Mismos valores, columnas y orden (los dtypes pueden diferir: category frente a texto)."""
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    for col in a.columns:
+        x = pd.Series(a[col].to_numpy(dtype=object)).where(a[col].notna().to_numpy(), None)
+        y = pd.Series(b[col].to_numpy(dtype=object)).where(b[col].notna().to_numpy(), None)
+        if not x.equals(y):
+            return False
+    return True
+
+
+def pandas_tables(df, filter_index, selections):
+    df_f = filter_frame(df, filter_index, selections)
+    return {
+        "dinamizadores": reports.dinamizadores_table(df_f),
+        "top": reports.top_table(df_f),
+        "infoplazas": reports.infoplazas_tables(df, df_f, selections),
+    }
+
+
+def sql_tables(engine, selections):
+    return {
+        "dinamizadores": engine.dinamizadores_table(selections),
+        "top": engine.top_table(selections),
+        "infoplazas": engine.infoplazas_tables(selections),
+    }
+
+
+def compare(expected, got):
+    """Nombres de las tablas que no coinciden."""
+    bad = [name for name in ("dinamizadores", "top") if not same_result(expected[name], got[name])]
+    a, b = expected["infoplazas"], got["infoplazas"]
+    if (a is None) != (b is None):
+        bad.append("infoplazas")
+    elif a is not None:
+        if not (same_result(a[0], b[0]) and same_result(a[1], b[1])):
+            bad.append("infoplazas")
+        elif {k: list(v) for k, v in a[2].items()} != {k: list(v) for k, v in b[2].items()}:
+            bad.append("infoplazas (posiciones)")
+    return bad
+
+
+def random_selections(filter_index, rnd):
+    selections = {}
+    for col, entry in filter_index["columns"].items():
+        options = entry["options"]
+        kind = rnd.random()
+        if kind < 0.3:
+            selections[col] = list(options)        # vista inicial: todo elegido
+        elif kind < 0.4:
+            selections[col] = []                   # vacío: no filtra
+        else:
+            selections[col] = rnd.sample(options, rnd.randint(1, max(1, len(options) // 2)))
+    return selections
+
+
+def timed(fn, repeat=3):
+    fn()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--checks", type=int, default=50, help="selecciones al azar a verificar")
+    parser.add_argument("--threads", type=int, default=None, help="hilos de DuckDB (por defecto, todos)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df, filter_index, _ = prepare_dataset(dirty(make_responses(args.rows, seed=args.seed), args.seed))
+    start = time.perf_counter()
+    engine = DuckDBEngine(df, filter_index, threads=args.threads)
+    print(f"filas: {len(df):,}   preparar motor SQL: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rnd = random.Random(args.seed)
+    everything = {c: list(e["options"]) for c, e in filter_index["columns"].items()}
+    checks = [everything, {c: [] for c in everything}]
+    checks += [random_selections(filter_index, rnd) for _ in range(args.checks)]
+    failures = 0
+    for selections in checks:
+        bad = compare(pandas_tables(df, filter_index, selections), sql_tables(engine, selections))
+        if bad:
+            failures += 1
+            print(f"DIFERENTE en {', '.join(bad)}: {selections}")
+    print(f"verificación: {len(checks) - failures}/{len(checks)} selecciones idénticas")
+
+    partial = dict(everything)
+    for col in ("Año", "Regional"):
+        partial[col] = everything[col][:1]
+    for label, selections in [("todo elegido", everything), ("parcial", partial)]:
+        for name in ("dinamizadores", "top", "infoplazas"):
+            def run_pandas():
+                df_f = filter_frame(df, filter_index, selections)
+                if name == "infoplazas":
+                    return reports.infoplazas_tables(df, df_f, selections)
+                return getattr(reports, f"{name}_table")(df_f)
+
+            def run_sql():
+                return getattr(engine, f"{name}_table" if name != "infoplazas" else "infoplazas_tables")(selections)
+
+            t_pd, t_sql = timed(run_pandas), timed(run_sql)
+            print(f"[{label}] {name:<14} pandas: {t_pd * 1000:8.1f} ms   duckdb: {t_sql * 1000:8.1f} ms"
+                  f"   ({t_pd / t_sql:5.1f}x)")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark de la descarga de la hoja contra `FakeWorksheet`.
+
+Con una hoja sintética ancha (las columnas del informe más `--extra-columns`
+preguntas que el informe no usa, intercaladas) reporta celdas descargadas y
+tiempo de la hoja completa frente a solo `REPORT_COLUMNS`, y el de una
+sincronización incremental. La paridad, los reintentos y la conservación de
+los últimos datos buenos se prueban en tests/test_fetch.py.
+
+Uso:
+    python bench/bench_fetch.py --rows 100000 --extra-columns 25
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sources import REPORT_COLUMNS, FakeWorksheet, load_worksheet  # noqa: E402
+from synthetic import make_responses  # noqa: E402
+
+
+def wide_sheet(rows, extra, seed=0):
+    """Las respuestas con `extra` columnas de texto que el informe no usa, en posiciones al azar."""
+    raw = make_responses(rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    for i in range(extra):
+        raw.insert(int(rng.integers(0, raw.shape[1] + 1)), f"Pregunta {i + 1}",
+                   np.where(rng.random(rows) < 0.3, "", f"respuesta {i + 1}"))
+    return raw
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--extra-columns", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = wide_sheet(args.rows, args.extra_columns, args.seed)
+    split = args.rows - args.rows // 100
+
+    # Hoja completa frente a solo las columnas del informe.
+    ws = FakeWorksheet.from_frame(raw)
+    _, t_full = timed(lambda: load_worksheet(ws, "full"))
+    cells_full, ws.cells = ws.cells, 0
+    projected, t_proj = timed(lambda: load_worksheet(ws, "full", columns=REPORT_COLUMNS))
+    cells_proj = ws.cells
+
+    # Incremental con columnas: una sola llamada trae encabezado, última fila y filas nuevas.
+    with tempfile.TemporaryDirectory() as tmp:
+        ws = FakeWorksheet.from_frame(raw.iloc[:split], extra_rows=50)
+        load_worksheet(ws, "incremental", tmp, REPORT_COLUMNS)
+        ws.append_rows(raw.iloc[split:].astype(str).values.tolist())
+        ws.calls = 0
+        _, t_sync = timed(lambda: load_worksheet(ws, "incremental", tmp, REPORT_COLUMNS))
+
+    print(f"filas: {args.rows:,}   columnas de la hoja: {raw.shape[1]}   del informe: {projected.shape[1]}")
+    print(f"hoja completa:   {cells_full:>12,} celdas   {t_full:6.2f} s")
+    print(f"solo informe:    {cells_proj:>12,} celdas   {t_proj:6.2f} s   ({cells_full / cells_proj:.1f}x menos celdas)")
+    print(f"incremental +1%: {t_sync:6.2f} s   llamadas: {ws.calls}")
+
+
+if __name__ == "__main__":
+    main()
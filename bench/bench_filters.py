@@ -0,0 +1,71 @@
+"""
+Benchmark de los filtros de la barra lateral.
+
+Compara el tiempo del índice de bitmaps de `filters.py` con la cadena anterior
+de `df.copy()` + `isin` por columna, sobre respuestas sintéticas. Que ambos
+den las mismas filas se prueba en tests/test_filters.py.
+
+Uso:
+    python bench/bench_filters.py --rows 300000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from filters import FILTER_COLUMNS, build_filter_index, filter_positions  # noqa: E402
+from schema import apply_schema  # noqa: E402
+from synthetic import MESES, make_responses  # noqa: E402
+
+
+def legacy_filter(df, selections):
+    df_f = df.copy()
+    for col, selected in selections.items():
+        if selected:
+            df_f = df_f[df_f[col].isin(selected)]
+    return df_f
+
+
+def timed(fn, repeat=20):
+    """(resultado, segundos promedio de `repeat` ejecuciones)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = apply_schema(make_responses(args.rows, seed=args.seed))
+    index, t_build = timed(lambda: build_filter_index(df), repeat=1)
+
+    # Todo elegido (lo que ocurre en cada rerun por defecto) y una selección parcial.
+    regionales = index["columns"]["Regional"]["options"]
+    cases = {
+        "todo elegido": {c: index["columns"][c]["options"] for c in FILTER_COLUMNS},
+        "parcial": {
+            "Año": index["columns"]["Año"]["options"][-2:],
+            "Mes": MESES[:3],
+            "Regional": regionales[:2],
+            "Provincia": index["columns"]["Provincia"]["options"],
+            "Facilitador": [],
+        },
+    }
+
+    print(f"filas:            {args.rows:,}")
+    print(f"construir índice: {t_build * 1000:8.2f} ms (una vez por carga)")
+    for name, selections in cases.items():
+        _, t_legacy = timed(lambda: legacy_filter(df, selections))
+        rows, t_index = timed(lambda: filter_positions(index, selections))
+        count = len(df) if rows is None else len(rows)
+        print(f"[{name}] anterior: {t_legacy * 1000:8.2f} ms   índice: {t_index * 1000:8.2f} ms"
+              f"   ({t_legacy / t_index:6.1f}x, {count:,} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark de la carga por particiones de año (`partitions.py`).
+
+Simula una hoja por año con `FakeWorksheet` y una latencia fija por llamada a
+la API, y compara: leer las hojas una tras otra, la primera carga en paralelo,
+una segunda carga (años cerrados ya en memoria, solo se vuelve a consultar el
+año en curso) y una carga con un solo año elegido.
+
+Uso:
+    python bench/bench_partitions.py --rows 100000 --years 2021 2022 2023 2024 2025 --latency 0.5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from partitions import PartitionedSource, combine  # noqa: E402
+from sources import FakeWorksheet, WorksheetSource  # noqa: E402
+from synthetic import make_responses  # noqa: E402
+
+
+class SlowWorksheet(FakeWorksheet):
+    """`FakeWorksheet` con `latency` segundos de espera por llamada, como la red."""
+
+    latency = 0.0
+
+    def get_all_values(self, **kwargs):
+        time.sleep(self.latency)
+        return super().get_all_values(**kwargs)
+
+    def batch_get(self, ranges, **kwargs):
+        time.sleep(self.latency)
+        return super().batch_get(ranges, **kwargs)
+
+
+def make_sources(raw, years, tmp, latency):
+    SlowWorksheet.latency = latency
+    current = max(years)
+    sources = {}
+    for year in years:
+        part = raw[raw["Año"] == str(year)] if str(year) in set(raw["Año"]) else raw.iloc[:0]
+        # Sin datos de ese año en la muestra, se reutilizan los de otro con el Año cambiado.
+        if part.empty:
+            part = raw[raw["Año"] == raw["Año"].iloc[0]].assign(**{"Año": str(year)})
+        ws = SlowWorksheet.from_frame(part)
+        mode = "incremental" if year == current else "frozen"
+        sources[year] = WorksheetSource(ws, mode, os.path.join(tmp, str(year)))
+    return sources
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="filas por año")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022, 2023, 2024, 2025])
+    parser.add_argument("--latency", type=float, default=0.5, help="segundos por llamada a la API")
+    args = parser.parse_args()
+
+    raw = make_responses(args.rows * 3, years=(2023, 2024, 2025))
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = make_sources(raw, args.years, os.path.join(tmp, "a"), args.latency)
+        frames, t_seq = timed(lambda: [sources[y].load() for y in sorted(sources)])
+        rows = len(combine(frames))
+
+        # Mismas hojas, snapshots nuevos: la primera carga descarga todo.
+        partitioned = PartitionedSource(make_sources(raw, args.years, os.path.join(tmp, "b"), args.latency), 3600)
+        _, t_first = timed(lambda: partitioned.load(args.years))
+        _, t_second = timed(lambda: partitioned.load(args.years))
+        partitioned.refresh(timeout=60)
+        _, t_after_refresh = timed(lambda: partitioned.load(args.years))
+        oldest = min(args.years)
+        fresh = PartitionedSource(make_sources(raw, args.years, os.path.join(tmp, "c"), args.latency), 3600)
+        _, t_one = timed(lambda: fresh.load([oldest]))
+
+    print(f"{len(args.years)} hojas, {rows:,} filas en total, {args.latency:.2f} s por llamada a la API")
+    print(f"una tras otra:                  {t_seq:7.2f} s")
+    print(f"en paralelo, primera carga:     {t_first:7.2f} s   ({t_seq / t_first:.1f}x)")
+    print(f"segunda carga (en memoria):     {t_second * 1000:7.1f} ms")
+    print(f"tras refrescar el año en curso: {t_after_refresh * 1000:7.1f} ms")
+    print(f"solo {oldest}, primera carga:      {t_one:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
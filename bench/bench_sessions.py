@@ -0,0 +1,111 @@
+"""
+Benchmark de memoria y tiempo con varias sesiones simultáneas.
+
+Simula `--sessions` sesiones que eligen entre unas pocas selecciones de filtros
+(como en una revisión mensual) y ejecutan las tablas de Dinamizadores, Top e
+Infoplazas. Compara dos esquemas:
+
+- anterior: cada sesión recibe su propia copia del conjunto de datos (lo que
+  hacía `st.cache_data` al deserializar), hace otra `df.copy()`, filtra y arma
+  InfoplazaFull en cada tabla;
+- compartido: un único conjunto de datos con InfoplazaFull precalculada y un
+  caché LRU de filas filtradas por selección, común a todas las sesiones (como
+  `filtered()` en `app.py`).
+
+Mide la memoria que retienen todas las sesiones a la vez y el tiempo total, y
+verifica que ambos esquemas den las mismas tablas.
+
+Uso:
+    python bench/bench_sessions.py --rows 300000 --sessions 30
+"""
+import argparse
+import functools
+import gc
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import reports  # noqa: E402
+from bench_engines import same_result  # noqa: E402
+from dataset import prepare_dataset  # noqa: E402
+from filters import filter_frame  # noqa: E402
+from synthetic import make_responses  # noqa: E402
+
+CACHE_ENTRIES = 16
+
+
+def legacy_session(blob, filter_index, selections):
+    df = pickle.loads(blob).drop(columns="InfoplazaFull")  # copia propia, sin la columna derivada
+    df = df.copy()
+    df_f = filter_frame(df, filter_index, selections)
+    tables = [reports.dinamizadores_table(df_f), reports.top_table(df_f)]
+    tables += reports.infoplazas_tables(df, df_f, selections)[:2]
+    return df, df_f, tables
+
+
+def shared_session(df, filtered, selection_key):
+    selections = dict(selection_key)
+    df_f = filtered(selection_key)
+    tables = [reports.dinamizadores_table(df_f), reports.top_table(df_f)]
+    tables += reports.infoplazas_tables(df, df_f, selections)[:2]
+    return df_f, tables
+
+
+def run_sessions(fn, choices):
+    """Ejecuta una sesión por elección y devuelve (sesiones vivas, segundos, MB retenidos)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    sessions = [fn(choice) for choice in choices]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sessions, elapsed, current / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--selections", type=int, default=4, help="selecciones distintas entre sesiones")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df, filter_index, _ = prepare_dataset(make_responses(args.rows, seed=args.seed))
+    rnd = random.Random(args.seed)
+    options = {col: entry["options"] for col, entry in filter_index["columns"].items()}
+    keys = [tuple((col, tuple(values)) for col, values in options.items())]
+    while len(keys) < args.selections:
+        keys.append(tuple(
+            (col, tuple(values if col != "Regional" else rnd.sample(values, max(1, len(values) // 2))))
+            for col, values in options.items()
+        ))
+    choices = [keys[rnd.randrange(len(keys))] for _ in range(args.sessions)]
+
+    blob = pickle.dumps(df)
+
+    @functools.lru_cache(maxsize=CACHE_ENTRIES)
+    def filtered(selection_key):
+        return filter_frame(df, filter_index, dict(selection_key))
+
+    legacy, t_legacy, mb_legacy = run_sessions(
+        lambda key: legacy_session(blob, filter_index, dict(key)), choices)
+    shared, t_shared, mb_shared = run_sessions(lambda key: shared_session(df, filtered, key), choices)
+
+    same = all(
+        same_result(a, b) for old, new in zip(legacy, shared) for a, b in zip(old[2], new[1])
+    )
+    print(f"filas: {args.rows:,}   sesiones: {args.sessions}   selecciones distintas: {len(keys)}")
+    print(f"anterior:    {t_legacy:7.2f} s   {mb_legacy:8.1f} MB retenidos")
+    print(f"compartido:  {t_shared:7.2f} s   {mb_shared:8.1f} MB retenidos"
+          f"   ({t_legacy / t_shared:.1f}x, {'resultado idéntico' if same else 'RESULTADO DIFERENTE'})")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Suite de benchmarks del informe completo, sin Streamlit ni credenciales.
+
+Genera respuestas sintéticas (`synthetic.py`) y mide, por tamaño, cada etapa de
+una recarga y de una interacción: lectura de la fuente, preparación del
+conjunto de datos (lo que hacía `get_data()`), filtros de la barra lateral y
+los cálculos de cada pestaña. Reporta tiempo, filas/s y pico de memoria de
+cada etapa, y puede guardar el resultado en JSON para compararlo con una
+corrida anterior.
+
+Uso:
+    python bench/bench_suite.py --sizes 10k 100k 1m --json bench-hoy.json
+    python bench/bench_suite.py --sizes 100k --compare bench-ayer.json
+    python bench/bench_suite.py --sizes 10k --source fake   # hoja en memoria + snapshot
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import reports  # noqa: E402
+from dataset import prepare_dataset  # noqa: E402
+from filters import filter_frame  # noqa: E402
+from sources import FakeWorksheet, FileSource, WorksheetSource  # noqa: E402
+from synthetic import SIZES, make_responses  # noqa: E402
+
+
+def measure(fn):
+    """
+    Ejecuta `fn()` dos veces y devuelve (resultado, segundos, pico de memoria en MB).
+    El tiempo se toma en la primera: tracemalloc hace mucho más lentas las etapas
+    que crean objetos de Python, así que el pico se mide aparte.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    del out
+    gc.collect()
+    tracemalloc.start()
+    out = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak / 2**20
+
+
+def make_source(kind, raw, tmp):
+    if kind == "fake":
+        # Primera sincronización completa contra una hoja en memoria, como con gspread.
+        return WorksheetSource(FakeWorksheet.from_frame(raw), "incremental", os.path.join(tmp, "snapshot"))
+    path = os.path.join(tmp, f"respuestas.{kind}")
+    if kind == "parquet":
+        raw.to_parquet(path, index=False)
+    else:
+        raw.to_csv(path, index=False, encoding="utf-8-sig")
+    return FileSource(path)
+
+
+def run_size(rows, kind, seed):
+    raw = make_responses(rows, seed=seed)
+    results = {}
+
+    def stage(name, fn):
+        out, seconds, peak = measure(fn)
+        results[name] = {"s": seconds, "rows_per_s": rows / seconds if seconds else None, "peak_mb": peak}
+        return out
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = make_source(kind, raw, tmp)
+        loaded = stage("fuente", source.load)
+    df, filter_index, cube = stage("preparar", lambda: prepare_dataset(loaded))
+
+    everything = {c: e["options"] for c, e in filter_index["columns"].items()}
+    partial = dict(everything)
+    for col in ("Año", "Regional"):
+        if everything.get(col):
+            partial[col] = everything[col][:1]
+
+    stage("filtrar (todo)", lambda: filter_frame(df, filter_index, everything))
+    df_f = stage("filtrar (parcial)", lambda: filter_frame(df, filter_index, partial))
+    stage("kpi", lambda: reports.kpi_data(cube, partial))
+    stage("dinamizadores", lambda: reports.dinamizadores_table(df_f))
+    stage("top", lambda: reports.top_table(df_f))
+    stage("infoplazas", lambda: reports.infoplazas_tables(df, df_f, partial))
+    return results
+
+
+def print_results(label, results, previous=None):
+    print(f"\n== {label} ==")
+    print(f"{'etapa':<20}{'tiempo':>12}{'filas/s':>14}{'pico MB':>10}{'vs anterior':>14}")
+    for name, r in results.items():
+        delta = ""
+        if previous and name in previous:
+            delta = f"{r['s'] / previous[name]['s']:.2f}x" if previous[name]["s"] else ""
+        rate = f"{r['rows_per_s']:,.0f}" if r["rows_per_s"] else "-"
+        print(f"{name:<20}{r['s'] * 1000:>9.1f} ms{rate:>14}{r['peak_mb']:>10.1f}{delta:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k"], help="10k, 100k, 1m o número de filas")
+    parser.add_argument("--source", choices=["parquet", "csv", "fake"], default="parquet")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    parser.add_argument("--compare", help="resultados JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            previous = json.load(fh)["results"]
+
+    all_results = {}
+    for size in args.sizes:
+        rows = SIZES.get(size.lower()) or int(size)
+        label = f"{rows:,} filas ({args.source})"
+        all_results[str(rows)] = run_size(rows, args.source, args.seed)
+        print_results(label, all_results[str(rows)], previous.get(str(rows)))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"source": args.source, "seed": args.seed, "results": all_results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
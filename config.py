@@ -0,0 +1,13 @@
+"""
+Configuración de la hoja de respuestas compartida por la app (`app.py`) y la
+exportación por lotes (`export.py`). Lo demás se configura al inicio de app.py.
+"""
+SHEET_ID = "16PzfegYvX0ywjOZ0zh3MS9-xxNBNugeMeXGLDqykQRs"
+SHEET_NAME = "Respuestas de formulario 1"
+# Snapshot local de la hoja que sincroniza la app (ver snapshot.py).
+SNAPSHOT_DIR = ".cache/respuestas"
+# Snapshot propio de export.py: puede correr mientras la app sincroniza el suyo sin que uno
+# borre las partes que el otro todavía referencia.
+EXPORT_SNAPSHOT_DIR = ".cache/exportacion/respuestas"
+# Credenciales de la cuenta de servicio fuera de Streamlit (la app usa st.secrets).
+SECRETS_FILE = ".streamlit/secrets.toml"
@@ -0,0 +1,158 @@
+"""
+Cubo de participación pre-agregado para la pestaña KPI y sus gráficos.
+
+Se calcula una sola vez por carga de datos al grano
+(Año, Mes, Regional, Provincia, Facilitador, #). Cada celda guarda su número
+de registros y, por cada medida de conteo distinto (sesiones, dinamizadores,
+temas), el conjunto de códigos enteros que aparecen en ella. Los conjuntos se
+guardan como pares (celda, código) ordenados y sin repetir, de modo que la
+unión de varias celdas es exacta: no hace falta volver a recorrer las filas.
+
+Las celdas son un DataFrame pequeño con las mismas columnas de filtro que la
+tabla original, así que se filtran con el mismo índice de `filters.py`.
+"""
+import numpy as np
+import pandas as pd
+
+from filters import build_filter_index, filter_positions
+
+CUBE_DIMENSIONS = ["Año", "Mes", "Regional", "Provincia", "Facilitador", "#"]
+# medida -> columna cuyo número de valores distintos se cuenta
+CUBE_MEASURES = {
+    "sesiones": "CountSesión",
+    "dinamizadores": "_dinamizador_id",
+    "temas": "Tema",
+}
+# Agrupaciones de los gráficos de la pestaña KPI, resueltas al construir el cubo.
+CUBE_GROUPINGS = [("Año", "Mes"), ("Regional",), ("Provincia",)]
+
+
+def _codes(series):
+    """Códigos enteros globales de la columna (-1 para nulos)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64)
+    if pd.api.types.is_integer_dtype(series.dtype):
+        # Ya son códigos (p. ej. `_dinamizador_id`): se usan tal cual.
+        return series.to_numpy(dtype=np.int64, na_value=-1)
+    return pd.factorize(series)[0].astype(np.int64)
+
+
+# Tamaño máximo de la tabla grupos x códigos para contar distintos marcando
+# posiciones; por encima se ordena con np.unique.
+MAX_SEEN_TABLE = 50_000_000
+
+
+def _distinct_pairs(groups, codes):
+    """Pares (grupo, código) únicos, ordenados por grupo y luego por código."""
+    valid = codes >= 0
+    if not valid.any():
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    width = int(codes.max()) + 1
+    pairs = np.sort(groups[valid] * width + codes[valid])
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return pairs // width, pairs % width
+
+
+def _distinct_per_group(groups, codes, ngroups):
+    """Número de códigos distintos por grupo (los pares pueden repetirse)."""
+    if not len(codes):
+        return np.zeros(ngroups, dtype=np.int64)
+    width = int(codes.max()) + 1
+    if ngroups * width <= MAX_SEEN_TABLE:
+        seen = np.zeros(ngroups * width, dtype=bool)
+        seen[groups * width + codes] = True
+        return seen.reshape(ngroups, width).sum(axis=1)
+    groups, _ = _distinct_pairs(groups, codes)
+    return np.bincount(groups, minlength=ngroups)
+
+
+def _grouping(cells, by):
+    """Grupo de cada celda según `by` (-1 si tiene algún nulo, como en groupby)."""
+    return cells.groupby(by, observed=True, sort=True).ngroup().fillna(-1).to_numpy().astype(np.int64)
+
+
+def build_cube(df):
+    dims = [c for c in CUBE_DIMENSIONS if c in df.columns]
+    if dims:
+        cell_of_row = df.groupby(dims, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+    else:
+        cell_of_row = np.zeros(len(df), dtype=np.int64)
+    cell_of_row = cell_of_row.astype(np.int64)
+    _, first_row = np.unique(cell_of_row, return_index=True)
+
+    cells = df[dims].iloc[first_row].reset_index(drop=True)
+    cells["registros"] = np.bincount(cell_of_row, minlength=len(cells))
+
+    measures = {}
+    for name, col in CUBE_MEASURES.items():
+        if col in df.columns:
+            measures[name] = _distinct_pairs(cell_of_row, _codes(df[col]))
+    groupings = {
+        by: _grouping(cells, list(by)) for by in CUBE_GROUPINGS if all(c in cells.columns for c in by)
+    }
+    return {
+        "cells": cells,
+        "index": build_filter_index(cells),
+        "measures": measures,
+        "groupings": groupings,
+    }
+
+
+def select_cells(cube, selections):
+    """Máscara booleana de las celdas que cumplen los filtros de la barra lateral."""
+    positions = filter_positions(cube["index"], selections)
+    selected = np.zeros(len(cube["cells"]), dtype=bool)
+    if positions is None:
+        selected[:] = True
+    else:
+        selected[positions] = True
+    return selected
+
+
+def total_rows(cube, selected):
+    return int(cube["cells"]["registros"].to_numpy()[selected].sum())
+
+
+def count_distinct(cube, selected, name):
+    """Valores distintos de la medida `name` en la unión de las celdas elegidas."""
+    if name not in cube["measures"]:
+        return 0
+    pair_cell, code = cube["measures"][name]
+    codes = code[selected[pair_cell]]
+    return int(_distinct_per_group(np.zeros(len(codes), dtype=np.int64), codes, 1)[0])
+
+
+def count_distinct_dimension(cube, selected, col):
+    if col not in cube["cells"].columns:
+        return 0
+    return cube["cells"][col][selected].nunique()
+
+
+def count_distinct_by(cube, selected, name, by, label):
+    """
+    Equivale a `df_f.groupby(by, observed=True)[col].nunique().reset_index(name=label)`
+    calculado sobre las celdas elegidas del cubo.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    cells = cube["cells"]
+    group = cube["groupings"].get(tuple(by))
+    if group is None:
+        group = _grouping(cells, by)
+    ngroups = int(group.max()) + 1 if len(group) else 0
+    in_group = selected & (group >= 0)
+
+    present = np.zeros(ngroups, dtype=bool)
+    present[group[in_group]] = True
+    representative = np.zeros(ngroups, dtype=np.int64)
+    representative[group[in_group]] = np.flatnonzero(in_group)
+
+    counts = np.zeros(ngroups, dtype=np.int64)
+    if name in cube["measures"]:
+        pair_cell, code = cube["measures"][name]
+        keep = in_group[pair_cell]
+        counts = _distinct_per_group(group[pair_cell[keep]], code[keep], ngroups)
+
+    out = cells[by].iloc[representative[present]].reset_index(drop=True)
+    out[label] = counts[present]
+    return out
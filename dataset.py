@@ -0,0 +1,58 @@
+"""
+Preparación del conjunto de datos del informe a partir de la hoja cruda.
+
+Es lo que hace cada recarga: aplicar el esquema, identificar dinamizadores,
+calcular las columnas derivadas y construir el índice de filtros y el cubo de
+la pestaña KPI. El resultado se comparte tal cual entre todas las sesiones.
+"""
+from cube import build_cube
+from filters import build_filter_index
+from identities import IdentityIndex
+from instrument import stage
+from reports import with_infoplaza_full
+from schema import apply_schema
+
+
+def prepare_dataset(df, identities=None, streams=None):
+    """
+    Devuelve `(df, filter_index, cube)` a partir de la hoja como texto.
+
+    `identities` es el índice de dinamizadores (persistente); sin él se
+    construye uno en memoria solo para esta carga. `streams` son las hojas que
+    forman `df`, en orden: `[(nombre, filas)]`; por defecto, una sola.
+    `df` no se modifica.
+    """
+    rows = len(df)
+    df = df.copy(deep=False)  # con copy-on-write no copia datos; las columnas nuevas van a la copia
+    # Tipos compactos: categorías, Año entero, Marca temporal como fecha
+    with stage("parse", rows_in=rows) as s:
+        df = apply_schema(df)
+        s.rows_out = len(df)
+    # Índice de dinamizadores: solo las filas que cada hoja agregó desde la última carga
+    if identities is None:
+        identities = IdentityIndex()
+    with stage("identities", rows_in=rows) as s:
+        start, processed = 0, 0
+        for name, count in streams or [("respuestas", rows)]:
+            processed += identities.update(df.iloc[start:start + count], stream=name)
+            start += count
+        s.rows_out = processed
+    # Normalizaciones: cédula canónica, ID y nombre de cada dinamizador (como categorías)
+    with stage("normalize", rows_in=rows) as s:
+        df = apply_schema(identities.apply(df))
+        s.rows_out = len(df)
+    # Columnas derivadas, una sola vez por carga (antes se armaban en cada cálculo de sección)
+    if "#" in df.columns and "INFOPLAZAS" in df.columns:
+        with stage("derive", rows_in=rows):
+            df = apply_schema(with_infoplaza_full(df))
+    # Bitmaps por valor de cada filtro y cubo de la pestaña KPI, una sola vez por carga
+    with stage("filter_index", rows_in=rows):
+        filter_index = build_filter_index(df)
+    with stage("cube", rows_in=rows) as s:
+        cube = build_cube(df)
+        s.rows_out = len(cube["cells"])
+    return df, filter_index, cube
+
+
+def load_dataset(source, identities=None):
+    return prepare_dataset(source.load(), identities)
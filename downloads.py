@@ -0,0 +1,128 @@
+"""
+Descargas CSV bajo demanda para los botones de la app.
+
+El CSV se genera solo cuando alguien pulsa el botón, por bloques de filas
+escritos directamente a un archivo en disco (opcionalmente gzip o zip), sin
+armar todo el contenido como un único objeto `bytes`. El archivo queda en
+caché en `EXPORT_DIR` con una clave calculada a partir del contenido de la
+tabla: volver a descargar lo mismo no vuelve a serializar, y tras reiniciar la
+app nunca se entrega el CSV de datos anteriores.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+from instrument import stage
+
+EXPORT_DIR = ".cache/exportaciones"
+# Filas por bloque al escribir el CSV.
+CHUNK_ROWS = 50_000
+# Archivos que se conservan en EXPORT_DIR; los más viejos se borran.
+MAX_EXPORT_FILES = 64
+# compresión -> (extensión agregada al nombre, tipo MIME)
+COMPRESSIONS = {
+    "none": ("", "text/csv"),
+    "gzip": (".gz", "application/gzip"),
+    "zip": (".zip", "application/zip"),
+}
+
+
+def download_name(file_name, compression):
+    return file_name + COMPRESSIONS[compression][0]
+
+
+def mime_type(compression):
+    return COMPRESSIONS[compression][1]
+
+
+def write_csv(df, fh, encoding="utf-8"):
+    """Escribe `df` como CSV en el archivo binario `fh`, por bloques de CHUNK_ROWS filas."""
+    # El BOM de "utf-8-sig" va solo al principio, no en cada bloque.
+    body_encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+    fh.write(df.iloc[:0].to_csv(index=False).encode(encoding))
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS]
+        fh.write(chunk.to_csv(index=False, header=False).encode(body_encoding))
+
+
+def table_digest(df):
+    """Huella del contenido de `df` (columnas, tipos y valores); no depende de la versión en memoria."""
+    digest = hashlib.sha1(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def export_path(file_name, df, compression, encoding="utf-8", directory=EXPORT_DIR):
+    key = (file_name, table_digest(df), compression, encoding)
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return Path(directory) / f"{digest}-{download_name(file_name, compression)}"
+
+
+# Un candado por archivo: las sesiones son hilos del mismo proceso y pueden pedir el mismo CSV a la vez.
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _path_lock(path):
+    with _locks_guard:
+        return _locks.setdefault(str(path), threading.Lock())
+
+
+def csv_export(df, file_name, compression="none", encoding="utf-8", directory=EXPORT_DIR):
+    """
+    Devuelve la ruta del CSV de `df` (comprimido según `compression`), escribiéndolo
+    solo si no existe ya uno con el mismo contenido.
+    """
+    path = export_path(file_name, df, compression, encoding, directory)
+    if path.exists():
+        return path
+    with _path_lock(path):
+        if not path.exists():  # otra sesión pudo escribirlo mientras se esperaba el candado
+            _write(df, file_name, path, compression, encoding)
+    return path
+
+
+def _write(df, file_name, path, compression, encoding):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        _write_file(df, file_name, tmp, compression, encoding)
+        os.replace(tmp, path)  # reemplazo atómico
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _prune(path.parent)
+
+
+def _write_file(df, file_name, tmp, compression, encoding):
+    with stage(f"export:{file_name}", rows_in=len(df)) as s:
+        if compression == "gzip":
+            with gzip.open(tmp, "wb", compresslevel=6) as fh:
+                write_csv(df, fh, encoding)
+        elif compression == "zip":
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                with zf.open(file_name, "w", force_zip64=True) as fh:
+                    write_csv(df, fh, encoding)
+        else:
+            with open(tmp, "wb") as fh:
+                write_csv(df, fh, encoding)
+        s.rows_out = len(df)
+
+
+def _prune(directory):
+    files = sorted(
+        (p for p in Path(directory).iterdir() if p.is_file() and not p.name.endswith(".tmp")),
+        key=lambda p: p.stat().st_mtime,
+    )
+    for path in files[:-MAX_EXPORT_FILES]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
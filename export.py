@@ -0,0 +1,183 @@
+"""
+Exportación por lotes de los informes, sin Streamlit.
+
+Carga el conjunto de datos una sola vez y genera, para cada Regional, cada
+Provincia y cada mes (Año + Mes), las mismas tablas que muestra la app:
+listado de dinamizadores, ranking de dinamizadores, resumen y detalle de
+participación por infoplaza. Cada alcance se calcula en un proceso del pool.
+
+Estructura de salida:
+    <out>/<regional|provincia|mes>/<valor>/<tabla>.<csv|parquet>
+    <out>/<regional|provincia|mes>/<valor>.xlsx   (una hoja por tabla)
+
+Uso:
+    python export.py --file .cache/respuestas.parquet --out informes --format csv xlsx
+    python export.py --out informes/2025-10 --año 2025 --mes Octubre --by regional provincia
+    python export.py --out informes   # hoja de Google con .streamlit/secrets.toml
+"""
+import argparse
+import importlib.util
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import reports
+from config import EXPORT_SNAPSHOT_DIR, SECRETS_FILE, SHEET_ID, SHEET_NAME
+from dataset import load_dataset
+from filters import filter_frame
+from sources import REPORT_COLUMNS, FileSource, GoogleSheetSource
+
+PARTITIONS = {"regional": ["Regional"], "provincia": ["Provincia"], "mes": ["Año", "Mes"]}
+FORMATS = ["csv", "parquet", "xlsx"]
+# xlsxwriter escribe varias veces más rápido que openpyxl; se usa si está instalado.
+EXCEL_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else None
+
+# Conjunto de datos del proceso: se recibe una sola vez al iniciar cada proceso del pool.
+_DATA = None
+
+
+def slug(value):
+    text = re.sub(r"[^\w.-]+", "_", str(value), flags=re.UNICODE).strip("_")
+    return text or "vacio"
+
+
+def build_tables(df, df_f, selections):
+    """Las tablas de un alcance, en el mismo formato que las exporta la app."""
+    tables = {
+        "dinamizadores": reports.dinamizadores_table(df_f),
+        "top_dinamizadores": reports.top_table(df_f),
+    }
+    infoplazas = reports.infoplazas_tables(df, df_f, selections)
+    if infoplazas is not None:
+        final_summary, detail_table, _ = infoplazas
+        tables["resumen_infoplazas"] = final_summary.sort_values("TotalSesiones", ascending=False)
+        tables["detalle_infoplazas"] = detail_table
+    return tables
+
+
+def write_tables(tables, base, formats):
+    """Escribe `tables` bajo la ruta `base` (sin extensión) y devuelve los archivos creados."""
+    written = []
+    for fmt in formats:
+        if fmt == "xlsx":
+            path = base.with_suffix(".xlsx")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with pd.ExcelWriter(path, engine=EXCEL_ENGINE) as writer:
+                for name, table in tables.items():
+                    table.to_excel(writer, sheet_name=name[:31], index=False)
+            written.append(path)
+            continue
+        base.mkdir(parents=True, exist_ok=True)
+        for name, table in tables.items():
+            path = base / f"{name}.{fmt}"
+            if fmt == "parquet":
+                # Las categorías se guardan como texto para que el archivo sea portable.
+                table.astype({c: str for c in table.select_dtypes("category").columns}).to_parquet(path, index=False)
+            else:
+                table.to_csv(path, index=False, encoding="utf-8-sig")
+            written.append(path)
+    return written
+
+
+def _init_worker(data):
+    global _DATA
+    _DATA = data
+
+
+def _export_scope(task):
+    partition, values, selections, base, formats = task
+    df, filter_index = _DATA
+    df_f = filter_frame(df, filter_index, selections)
+    written = write_tables(build_tables(df, df_f, selections), Path(base), formats)
+    return partition, values, len(df_f), [str(p) for p in written]
+
+
+def plan_tasks(df, filter_index, out_dir, partitions, formats, base_selections):
+    """
+    Un trabajo por cada valor de cada partición que tiene respuestas (solo los
+    Año + Mes que aparecen en los datos). Las demás columnas de filtro quedan
+    como en la vista inicial de la app (todas las opciones elegidas), salvo las
+    que fija `base_selections`.
+    """
+    defaults = {col: entry["options"] for col, entry in filter_index["columns"].items()}
+    base_selections = {**defaults, **base_selections}
+    rows = filter_frame(df, filter_index, base_selections)
+    tasks = []
+    for partition in partitions:
+        cols = PARTITIONS[partition]
+        present = set(rows[cols].drop_duplicates().itertuples(index=False, name=None))
+        if partition == "mes":
+            años = base_selections.get("Año", [])
+            meses = base_selections.get("Mes", [])
+            combos = [(a, m) for a in años for m in meses if (a, m) in present]
+        else:
+            combos = [(v,) for v in base_selections.get(cols[0], []) if (v,) in present]
+        for combo in combos:
+            selections = dict(base_selections)
+            selections.update({c: [v] for c, v in zip(cols, combo)})
+            base = Path(out_dir) / partition / slug("-".join(str(v) for v in combo))
+            tasks.append((partition, combo, selections, str(base), formats))
+    return tasks
+
+
+def export_reports(df, filter_index, out_dir, partitions=tuple(PARTITIONS), formats=("csv",),
+                   base_selections=None, jobs=None):
+    """
+    Genera todos los informes y devuelve `(partición, valores, filas, archivos)`
+    por alcance. Con `jobs=1` se ejecuta en el proceso actual.
+    """
+    tasks = plan_tasks(df, filter_index, out_dir, partitions, list(formats), base_selections or {})
+    if jobs == 1:
+        _init_worker((df, filter_index))
+        return [_export_scope(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=((df, filter_index),)) as pool:
+        return list(pool.map(_export_scope, tasks))
+
+
+def make_source(args):
+    if args.file:
+        return FileSource(args.file)
+    import tomllib
+
+    with open(SECRETS_FILE, "rb") as fh:
+        credentials = tomllib.load(fh)["gcp_service_account"]
+    # Su propio snapshot: la app puede estar sincronizando el suyo al mismo tiempo.
+    return GoogleSheetSource(credentials, args.sheet_id, args.sheet_name, snapshot_dir=EXPORT_SNAPSHOT_DIR,
+                             columns=REPORT_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", required=True, help="carpeta de salida")
+    parser.add_argument("--file", help="CSV/Parquet local en lugar de la hoja de Google")
+    parser.add_argument("--sheet-id", default=SHEET_ID)
+    parser.add_argument("--sheet-name", default=SHEET_NAME)
+    parser.add_argument("--by", nargs="+", choices=list(PARTITIONS), default=list(PARTITIONS))
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["csv"])
+    parser.add_argument("--año", dest="years", nargs="+", type=int, help="limitar a estos años")
+    parser.add_argument("--mes", dest="months", nargs="+", help="limitar a estos meses")
+    parser.add_argument("--jobs", type=int, default=None, help="procesos (por defecto, uno por CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df, filter_index, _ = load_dataset(make_source(args))
+    loaded = time.perf_counter()
+    print(f"{len(df):,} filas cargadas en {loaded - start:.1f} s", file=sys.stderr)
+
+    base = {}
+    if args.years:
+        base["Año"] = args.years
+    if args.months:
+        base["Mes"] = args.months
+    results = export_reports(df, filter_index, args.out, args.by, args.format, base, args.jobs)
+    files = sum(len(r[3]) for r in results)
+    print(f"{len(results)} alcances, {files} archivos en {time.perf_counter() - loaded:.1f} s -> {args.out}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
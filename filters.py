@@ -0,0 +1,104 @@
+"""
+Índice de máscaras para los filtros de la barra lateral.
+
+Se construye una sola vez por carga de datos: para cada columna filtrable y
+cada valor distinto se guarda un bitmap (máscara booleana empaquetada con
+`np.packbits`, 1 bit por fila). Una selección se resuelve con OR dentro de
+cada columna y AND entre columnas sobre esos bitmaps, y al final se obtiene un
+único arreglo de posiciones de fila. No se crean DataFrames intermedios.
+"""
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ["Año", "Mes", "Regional", "Provincia", "Facilitador"]
+# Valores que no se ofrecen como opción en los filtros.
+HIDDEN_OPTIONS = ["", "Agregar al listado"]
+
+
+def clean_filter_options(series):
+    return sorted([x for x in series.dropna().unique() if str(x).strip() not in HIDDEN_OPTIONS])
+
+
+def _union(masks, nbytes):
+    if not masks:
+        return np.zeros(nbytes, dtype=np.uint8)
+    return np.bitwise_or.reduce(masks)
+
+
+def build_filter_index(df, columns=FILTER_COLUMNS):
+    """
+    Devuelve el índice de filtros de `df`.
+
+    Por columna: `options` (lo que muestra la barra lateral), `masks` (bitmap
+    por valor) y `all` (unión de las opciones visibles, o None si las opciones
+    cubren todas las filas y la columna se puede omitir al estar todo elegido).
+    """
+    rows = len(df)
+    nbytes = (rows + 7) // 8
+    index = {"rows": rows, "columns": {}}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col])  # nulos -> -1
+        masks = {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+        options = clean_filter_options(df[col])
+        covers_all = len(options) == len(uniques) and not (codes == -1).any()
+        index["columns"][col] = {
+            "options": options,
+            "masks": masks,
+            "all": None if covers_all else _union([masks[v] for v in options], nbytes),
+        }
+    return index
+
+
+def filter_options(index, col):
+    entry = index["columns"].get(col)
+    return entry["options"] if entry else []
+
+
+def _selects_all(entry, selected):
+    return len(selected) == len(entry["options"]) and set(selected) == set(entry["options"])
+
+
+def active_selections(index, selections):
+    """
+    Las columnas de `selections` que descartan filas, {columna: valores}. Se omiten
+    las selecciones vacías y las que eligen todo en una columna cuyas opciones
+    cubren todas las filas.
+    """
+    active = {}
+    for col, selected in selections.items():
+        entry = index["columns"].get(col)
+        if entry is None or not selected:
+            continue
+        if entry["all"] is None and _selects_all(entry, selected):
+            continue
+        active[col] = list(selected)
+    return active
+
+
+def filter_positions(index, selections):
+    """
+    Posiciones de las filas que cumplen `selections` ({columna: valores}).
+
+    Una selección vacía no filtra esa columna. Devuelve None si ninguna columna
+    restringe las filas (el llamador puede usar el DataFrame tal cual).
+    """
+    nbytes = (index["rows"] + 7) // 8
+    mask = None
+    for col, selected in active_selections(index, selections).items():
+        entry = index["columns"][col]
+        if _selects_all(entry, selected):
+            col_mask = entry["all"]
+        else:
+            col_mask = _union([entry["masks"][v] for v in selected if v in entry["masks"]], nbytes)
+        mask = col_mask if mask is None else mask & col_mask
+    if mask is None:
+        return None
+    return np.flatnonzero(np.unpackbits(mask, count=index["rows"]))
+
+
+def filter_frame(df, index, selections):
+    """Las filas de `df` que cumplen `selections`; sin filtros activos, `df` tal cual."""
+    rows = filter_positions(index, selections)
+    return df if rows is None else df.take(rows)
@@ -0,0 +1,206 @@
+"""
+Índice persistente de identidades de dinamizadores.
+
+Cada cédula se reduce a una clave canónica (`normalize.canonical_cedula_series`:
+"08-0123-00456", "8 123 456" y "8-123-456." son la misma persona) y recibe un
+ID entero estable, que no cambia entre cargas ni se reutiliza. Para cada ID se
+guarda el nombre a mostrar: el de su primera respuesta por "Marca temporal" (a
+igualdad, la primera de la hoja; las respuestas sin fecha válida van al final).
+
+`update()` incorpora solo las filas que una hoja agregó desde la última vez
+(se reconoce con el número de filas y el checksum de la última, como el
+snapshot, calculado solo sobre cédula, nombre y fecha) y guarda el índice en
+disco, así que sobrevive a reinicios. Si la hoja cambió de otra forma, se
+vuelven a procesar todas sus filas: el resultado es el mismo y los IDs ya
+asignados se conservan. Conviene pasarle la hoja con la "Marca temporal" ya
+convertida (`schema.apply_schema`) para no leer las fechas dos veces.
+
+`apply()` agrega a un DataFrame `_cedula_norm` (la clave canónica),
+`_dinamizador_id` (Int32, nulo si la cédula está vacía) y `_nombre_unificado`.
+
+Estructura en disco:
+    <dir>/meta.json             -> filas procesadas y checksum de la última, por hoja
+    <dir>/identidades.parquet   -> clave, nombre y primera marca temporal (fila = ID)
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from normalize import canonical_cedula_series
+from schema import parse_timestamp
+from snapshot import row_checksum
+
+META_FILE = "meta.json"
+TABLE_FILE = "identidades.parquet"
+META_VERSION = 1
+# Marca temporal de las respuestas sin fecha válida: después de todas las demás.
+NO_TIMESTAMP = np.iinfo(np.int64).max
+
+
+def _key_codes(series):
+    """
+    Código de clave canónica por fila (-1 sin cédula) y las claves distintas.
+    Solo se normalizan los valores distintos de la columna.
+    """
+    codes, uniques = pd.factorize(series)  # nulos -> -1
+    keys = canonical_cedula_series(pd.Series(uniques, dtype=object))
+    key_codes, keys = pd.factorize(keys)  # varias escrituras de una cédula -> una clave
+    return np.append(key_codes, -1)[codes], np.asarray(keys, dtype=object)  # -1 toma el último
+
+
+def _expand(values, codes):
+    """Categoría por fila a partir de un valor por código de `pd.factorize` (-1 = nulo)."""
+    small = pd.Categorical(values)
+    return pd.Categorical.from_codes(np.append(small.codes, -1)[codes], dtype=small.dtype)
+
+
+def _timestamps(series):
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = parse_timestamp(series)
+    values = series.to_numpy(dtype="datetime64[ns]").view(np.int64).copy()
+    values[series.isna().to_numpy()] = NO_TIMESTAMP
+    return values
+
+
+class IdentityIndex:
+    """
+    Claves canónicas -> ID, nombre y primera marca temporal. Sin `directory`
+    vive solo en memoria. Seguro para usarse desde varios hilos.
+    """
+
+    def __init__(self, directory=None, col_cedula="Cédula", col_nombre="Nombre y apellido",
+                 col_fecha="Marca temporal"):
+        self.directory = Path(directory) if directory else None
+        self.col_cedula = col_cedula
+        self.col_nombre = col_nombre
+        self.col_fecha = col_fecha
+        self._lock = threading.Lock()
+        self._keys = pd.Index([], dtype=object)
+        self._names = np.empty(0, dtype=object)
+        self._first = np.empty(0, dtype=np.int64)
+        self._streams = {}
+        if self.directory is not None:
+            self._load()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _checksum(self, df, row):
+        cols = [c for c in (self.col_cedula, self.col_nombre, self.col_fecha) if c in df.columns]
+        return row_checksum(df[cols].iloc[row].tolist())
+
+    def update(self, df, stream="respuestas"):
+        """
+        Incorpora las filas de `df` (la hoja `stream` completa) que aún no se
+        habían procesado. Devuelve cuántas filas se procesaron.
+        """
+        with self._lock:
+            state = self._streams.get(stream)
+            start = 0
+            if state and 0 < state["rows"] <= len(df):
+                if self._checksum(df, state["rows"] - 1) == state["last_row_checksum"]:
+                    start = state["rows"]
+            new = df.iloc[start:]
+            if len(new) and self.col_cedula in new:
+                self._fold(new)
+            self._streams[stream] = {
+                "rows": len(df),
+                "last_row_checksum": self._checksum(df, -1) if len(df) else None,
+            }
+            if self.directory is not None and self._streams[stream] != state:
+                self._save()
+            return len(new)
+
+    def _fold(self, new):
+        codes, keys = _key_codes(new[self.col_cedula])
+        valid = codes >= 0
+        valid[valid] = keys[codes[valid]] != ""
+        if not valid.any():
+            return
+        codes = codes[valid]
+        if self.col_fecha in new:
+            ts = _timestamps(new[self.col_fecha])[valid]
+        else:
+            ts = np.full(len(codes), NO_TIMESTAMP, dtype=np.int64)
+        names = (new[self.col_nombre].to_numpy(dtype=object) if self.col_nombre in new
+                 else np.full(len(new), None, dtype=object))[valid]
+        # Primera respuesta de cada clave en estas filas (orden estable: a igual fecha, la primera).
+        order = np.argsort(ts, kind="stable")
+        _, idx = np.unique(codes[order], return_index=True)  # primera aparición de cada clave
+        first = np.sort(order[idx])
+        first = first[np.argsort(ts[first], kind="stable")]
+        batch_keys, batch_names, batch_ts = keys[codes[first]], names[first], ts[first]
+
+        pos = self._keys.get_indexer(batch_keys)
+        known = pos >= 0
+        # Claves ya conocidas con una respuesta anterior: cambia el nombre a mostrar.
+        earlier = known.copy()
+        earlier[known] = batch_ts[known] < self._first[pos[known]]
+        if earlier.any():
+            self._names = self._names.copy()
+            self._first = self._first.copy()
+            self._names[pos[earlier]] = batch_names[earlier]
+            self._first[pos[earlier]] = batch_ts[earlier]
+        # Claves nuevas: IDs siguientes, en orden de primera respuesta.
+        fresh = ~known
+        if fresh.any():
+            self._keys = self._keys.append(pd.Index(batch_keys[fresh], dtype=object))
+            self._names = np.concatenate([self._names, batch_names[fresh]])
+            self._first = np.concatenate([self._first, batch_ts[fresh]])
+
+    def apply(self, df):
+        """
+        Agrega las columnas de identidad a `df`; la cédula y el nombre, como categorías.
+        Las cédulas que el índice no conoce quedan sin ID.
+        """
+        with self._lock:
+            index, names = self._keys, self._names
+        if self.col_cedula not in df:
+            return df
+        # Todo se resuelve sobre las claves distintas y se expande por código.
+        codes, keys = _key_codes(df[self.col_cedula])
+        key_ids = index.get_indexer(keys)
+        ids = np.append(key_ids, -1)[codes]
+        missing = ids < 0
+        df["_cedula_norm"] = _expand(keys, codes)
+        df["_dinamizador_id"] = pd.arrays.IntegerArray(np.where(missing, 0, ids).astype(np.int32), missing)
+        df["_nombre_unificado"] = _expand(np.append(names, None)[key_ids], codes)  # -1: sin nombre
+        return df
+
+    # ---- Persistencia ----
+    def _load(self):
+        try:
+            with open(self.directory / META_FILE, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            if meta.get("version") != META_VERSION:
+                return
+            table = pd.read_parquet(self.directory / TABLE_FILE)
+        except (OSError, ValueError):
+            return
+        self._keys = pd.Index(table["key"].to_numpy(dtype=object))
+        self._names = table["name"].to_numpy(dtype=object)
+        self._first = table["first_ts"].to_numpy(dtype=np.int64)
+        # Si el meta no corresponde a la tabla (escritura interrumpida), se conservan los IDs
+        # y las hojas se vuelven a procesar completas.
+        if len(table) == meta.get("ids"):
+            self._streams = meta["streams"]
+
+    def _save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        table = pd.DataFrame({
+            "key": self._keys.to_numpy(dtype=object),
+            "name": self._names,
+            "first_ts": self._first,
+        })
+        tmp = self.directory / (TABLE_FILE + ".tmp")
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, self.directory / TABLE_FILE)
+        meta = {"version": META_VERSION, "ids": len(table), "streams": self._streams}
+        tmp = self.directory / (META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, ensure_ascii=False)
+        os.replace(tmp, self.directory / META_FILE)  # reemplazo atómico
@@ -0,0 +1,147 @@
+"""
+Medición por etapas: tiempo, filas de entrada/salida y variación de memoria.
+
+Uso:
+    with stage("parse", rows_in=len(df)) as s:
+        df = apply_schema(df)
+        s.rows_out = len(df)
+
+Desactivado (por defecto), `stage()` devuelve siempre el mismo objeto que no
+hace nada, así que el costo es una llamada a función. Activado con
+`configure(enabled=True)` o con la variable de entorno INFORME_PERF=1, cada
+etapa se guarda en un historial en memoria (para el panel de la app y los
+percentiles) y se escribe como una línea JSON en `log_file`.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+# Mediciones que se conservan por etapa para calcular percentiles.
+HISTORY_SIZE = 500
+
+_enabled = os.environ.get("INFORME_PERF", "") not in ("", "0")
+_log_file = os.environ.get("INFORME_PERF_LOG", ".cache/perf.jsonl")
+_lock = threading.Lock()
+_history = defaultdict(lambda: deque(maxlen=HISTORY_SIZE))
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def configure(enabled=None, log_file=None):
+    global _enabled, _log_file
+    if enabled is not None:
+        _enabled = bool(enabled)
+    if log_file is not None:
+        _log_file = log_file
+
+
+def enabled():
+    return _enabled
+
+
+def _rss():
+    """Memoria residente del proceso en bytes (None si no se puede leer)."""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _NoopStage:
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP = _NoopStage()
+
+
+class _Stage:
+    def __init__(self, name, rows_in):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self._rss = _rss()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        rss = _rss()
+        record = {
+            "ts": time.time(),
+            "stage": self.name,
+            "ms": round(elapsed * 1000, 3),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "mem_delta_mb": round((rss - self._rss) / 2**20, 3) if rss is not None and self._rss is not None else None,
+            "thread": threading.current_thread().name,
+            "ok": exc_type is None,
+        }
+        _record(record)
+        return False
+
+
+def stage(name, rows_in=None):
+    """Context manager que mide la etapa `name` (no hace nada si está desactivado)."""
+    if not _enabled:
+        return _NOOP
+    return _Stage(name, rows_in)
+
+
+def _record(record):
+    line = json.dumps(record, ensure_ascii=False)
+    with _lock:
+        _history[record["stage"]].append(record)
+        if _log_file:
+            try:
+                os.makedirs(os.path.dirname(_log_file) or ".", exist_ok=True)
+                with open(_log_file, "a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+            except OSError:
+                pass
+
+
+def summary():
+    """Una fila por etapa: mediciones, p50/p95 en ms, y filas y memoria de la última."""
+    with _lock:
+        items = {name: list(records) for name, records in _history.items()}
+    rows = []
+    for name, records in sorted(items.items()):
+        ms = np.array([r["ms"] for r in records])
+        last = records[-1]
+        rows.append({
+            "etapa": name,
+            "n": len(records),
+            "p50 ms": round(float(np.percentile(ms, 50)), 1),
+            "p95 ms": round(float(np.percentile(ms, 95)), 1),
+            "última ms": round(last["ms"], 1),
+            "filas entrada": last["rows_in"],
+            "filas salida": last["rows_out"],
+            "Δ memoria MB": last["mem_delta_mb"],
+        })
+    return rows
+
+
+def reset():
+    with _lock:
+        _history.clear()
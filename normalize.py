@@ -0,0 +1,40 @@
+"""
+Normalización de cédulas de dinamizadores (la unificación de nombres está en
+`identities.py`).
+
+Todo se hace con operaciones vectorizadas sobre columnas completas: con
+cientos de miles de respuestas, recorrer fila por fila (`apply`/`iterrows`)
+era el mayor costo de cada refresco.
+"""
+import pandas as pd
+
+
+def normalize_cedula_series(series):
+    """
+    Deja solo los grupos de dígitos de cada cédula, separados por un guion.
+
+    "8 123  456" -> "8-123-456". Los valores nulos se mantienen como None.
+    """
+    result = pd.Series(None, index=series.index, dtype=object)
+    mask = series.notna()
+    if mask.any():
+        result[mask] = (
+            series[mask].astype(str)
+            .str.replace(r"[^0-9]+", "-", regex=True)
+            .str.strip("-")
+        )
+    return result
+
+
+def canonical_cedula_series(series):
+    """
+    Clave canónica de cada cédula: sus grupos de dígitos sin ceros a la
+    izquierda, separados por un guion.
+
+    "08-0123-00456", "8 123 456" y "8-123-456." -> "8-123-456".
+    """
+    result = normalize_cedula_series(series)
+    mask = result.notna()
+    if mask.any():
+        result[mask] = result[mask].str.replace(r"(^|-)0+(?=[0-9])", r"\1", regex=True)
+    return result
@@ -0,0 +1,98 @@
+"""
+Respuestas repartidas en una hoja (o archivo) por Año.
+
+Cada año es una partición con su propia fuente. Las de años cerrados ya no
+reciben respuestas: se leen la primera vez que alguien elige ese año y se
+conservan mientras viva el proceso. Solo la partición del año en curso se
+vuelve a consultar, con un `DatasetRefresher` propio. Los años que no se piden
+nunca se leen.
+
+Las particiones que faltan se descargan en paralelo en un pool de hilos (la
+descarga es sobre todo espera de red), mientras el hilo que las pidió espera la
+del año en curso.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from refresher import DatasetRefresher, build_if_changed
+
+# Descargas simultáneas como máximo (la API de Sheets limita las lecturas por minuto).
+MAX_WORKERS = 4
+
+
+class PartitionedSource:
+    """
+    `sources` = {año: fuente con `load()` y `token(df)`}. `current` es el año que se sigue
+    consultando (por defecto, el más reciente); su partición se recarga cada
+    `interval` segundos o con `refresh()`, igual que `DatasetRefresher`.
+    """
+
+    def __init__(self, sources, interval, current=None, max_workers=MAX_WORKERS):
+        self.sources = dict(sources)
+        self.current = max(self.sources) if current is None else current
+        self._refresher = DatasetRefresher(build_if_changed(self.sources[self.current]), interval)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="partition")
+        self._lock = threading.Lock()
+        self._closed = {}  # año -> Future con el DataFrame de la partición
+
+    def years(self):
+        return sorted(self.sources)
+
+    @property
+    def last_error(self):
+        return self._refresher.last_error
+
+    @property
+    def last_success(self):
+        return self._refresher.last_success
+
+    def refresh(self, timeout):
+        """Recarga la partición del año en curso (las cerradas no cambian)."""
+        return self._refresher.refresh(timeout)
+
+    def load(self, years):
+        """
+        Devuelve `(version, frames)`: {año: partición} de `years`, en orden de año.
+        `version` es la de la partición del año en curso, o 0 si no se pidió;
+        junto con los años identifica el contenido.
+        """
+        wanted = set(years)
+        years = [y for y in self.years() if y in wanted]
+        pending = {y: self._closed_partition(y) for y in years if y != self.current}
+        frames = {}
+        version = 0
+        if self.current in years:
+            version, frames[self.current] = self._refresher.get()
+        for year, future in pending.items():
+            try:
+                frames[year] = future.result()
+            except Exception:
+                # No se guarda el error: el próximo pedido vuelve a intentar.
+                with self._lock:
+                    if self._closed.get(year) is future:
+                        del self._closed[year]
+                raise
+        return version, {y: frames[y] for y in years}
+
+    def _closed_partition(self, year):
+        with self._lock:
+            future = self._closed.get(year)
+            if future is None:
+                future = self._closed[year] = self._pool.submit(self.sources[year].load)
+            return future
+
+
+def combine(frames):
+    """Une las particiones en una sola hoja de texto (columnas que falten en alguna quedan en "")."""
+    frames = [f for f in frames if len(f.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        # Copia superficial: la preparación agrega columnas y no debe tocar la partición guardada.
+        return frames[0].copy(deep=False)
+    df = pd.concat(frames, ignore_index=True)
+    if any(list(f.columns) != list(df.columns) for f in frames):
+        df = df.fillna("")
+    return df
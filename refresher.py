@@ -0,0 +1,124 @@
+"""
+Refresco en segundo plano del conjunto de datos (stale-while-revalidate).
+
+Un hilo vuelve a construir el conjunto de datos cada cierto intervalo, o cuando
+alguien lo pide con "Actualizar", fuera del camino de las peticiones. Cuando
+termina, reemplaza atómicamente la versión vigente. Los lectores siempre
+reciben de inmediato la última versión buena. Si una reconstrucción falla, se
+conserva la anterior y se guarda el error. Si la fuente no cambió, se conserva
+la versión vigente y con ella todos los cálculos guardados bajo esa versión.
+"""
+import threading
+import time
+
+# Lo devuelve `build()` cuando los datos no cambiaron: se conserva `(version, data)`.
+UNCHANGED = object()
+
+
+def build_if_changed(source, prepare=None):
+    """
+    `build` para `DatasetRefresher` que carga `source` y solo llama a `prepare(df)`
+    (por defecto devuelve `df`) si `source.token(df)` difiere del de la última
+    construcción; si no, devuelve UNCHANGED.
+    """
+    last = []
+
+    def build():
+        df = source.load()
+        token = source.token(df)
+        if last and last[0] == token:
+            return UNCHANGED
+        data = prepare(df) if prepare is not None else df
+        last[:] = [token]
+        return data
+
+    return build
+
+
+class DatasetRefresher:
+    """
+    Mantiene `(version, data)` actualizado con `build()` en un hilo propio.
+
+    `version` crece en 1 con cada reconstrucción exitosa que trae datos nuevos
+    (`build()` devuelve UNCHANGED si no los hay); sirve como clave de los
+    cálculos que dependen de los datos.
+    """
+
+    def __init__(self, build, interval):
+        self._build = build
+        self._interval = interval
+        self._build_lock = threading.Lock()   # una sola reconstrucción a la vez
+        self._start_lock = threading.Lock()
+        self._done = threading.Condition()
+        self._wake = threading.Event()
+        self._requested = 0   # pedidos de refresh()
+        self._served = 0      # pedidos atendidos por una reconstrucción que empezó después de ellos
+        self._current = None
+        self._thread = None
+        self.last_error = None
+        self.last_success = None
+
+    def get(self):
+        """Devuelve `(version, data)`. Solo la primera llamada espera la carga inicial."""
+        current = self._current
+        if current is None:
+            self._rebuild(only_if_empty=True)
+            current = self._current
+            if current is None:
+                raise self.last_error
+        self._start()
+        return current
+
+    def refresh(self, timeout):
+        """
+        Pide una reconstrucción inmediata y espera hasta `timeout` segundos a que
+        termine una que haya empezado después del pedido (una ya en curso puede
+        traer datos anteriores). Devuelve True si terminó bien; mientras tanto
+        los lectores siguen recibiendo la versión anterior.
+        """
+        with self._done:
+            self._requested += 1
+            target = self._requested
+        self._start()
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        with self._done:
+            while self._served < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+        return self.last_error is None
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self._rebuild()
+
+    def _rebuild(self, only_if_empty=False):
+        with self._build_lock:
+            if only_if_empty and self._current is not None:
+                return
+            with self._done:
+                requested = self._requested
+            try:
+                data = self._build()
+                error = None
+            except Exception as e:
+                data, error = None, e
+            with self._done:
+                if error is None:
+                    if data is not UNCHANGED:
+                        version = self._current[0] + 1 if self._current else 1
+                        self._current = (version, data)  # asignación atómica: los lectores ven una u otra
+                    self.last_success = time.time()
+                self.last_error = error
+                self._served = max(self._served, requested)
+                self._done.notify_all()
@@ -0,0 +1,121 @@
+"""
+Cálculos de cada sección del informe, sin dependencias de Streamlit.
+
+`app.py` los memoiza y los dibuja; aquí solo reciben DataFrames/índices ya
+construidos y devuelven tablas, así que también se pueden ejecutar sin
+interfaz (benchmarks, exportaciones).
+"""
+import pandas as pd
+
+from cube import count_distinct, count_distinct_by, count_distinct_dimension, select_cells, total_rows
+
+
+def with_infoplaza_full(df):
+    """`df` con InfoplazaFull ("# - INFOPLAZAS"); si ya la trae (se precalcula al cargar), tal cual."""
+    if "InfoplazaFull" in df.columns:
+        return df
+    return df.assign(InfoplazaFull=df["#"].astype(str) + " - " + df["INFOPLAZAS"].astype(str))
+
+
+# ---- KPI ----
+def kpi_data(cube, selections):
+    # Todo sale del cubo pre-agregado: se unen las celdas que cumplen los filtros.
+    cells = select_cells(cube, selections)
+    kpis = {
+        "total_registros": total_rows(cube, cells),
+        "sesiones_unicas": count_distinct(cube, cells, "sesiones"),
+        "din_uniq": count_distinct(cube, cells, "dinamizadores"),
+        "inf_uniq": count_distinct_dimension(cube, cells, "#"),
+        "temas_uniq": count_distinct(cube, cells, "temas"),
+    }
+    charts = {}
+    if "Mes" in cube["cells"]:
+        charts["g1"] = count_distinct_by(cube, cells, "sesiones", ["Año","Mes"], "Sesiones")
+        charts["g2"] = count_distinct_by(cube, cells, "dinamizadores", ["Año","Mes"], "Dinamizadores")
+    if "Regional" in cube["cells"]:
+        charts["g3"] = count_distinct_by(cube, cells, "dinamizadores", "Regional", "Dinamizadores")
+    if "Provincia" in cube["cells"]:
+        charts["g4"] = count_distinct_by(cube, cells, "dinamizadores", "Provincia", "Dinamizadores")
+    return kpis, charts
+
+
+# ---- Dinamizadores ----
+# Se agrupa por `_dinamizador_id` (entero, ver identities.py): la cédula y el nombre son
+# los mismos en todo el grupo y solo se toman de la primera fila.
+def dinamizadores_table(df_f):
+    df_f = with_infoplaza_full(df_f)
+    # Orden estable: entre respuestas con la misma marca temporal gana la primera de la hoja.
+    return df_f.sort_values("Marca temporal", kind="stable").groupby("_dinamizador_id").agg(
+        Cédula=("_cedula_norm", "first"),
+        Nombre=("_nombre_unificado", "first"),
+        Infoplaza=("InfoplazaFull", "first"),
+        Participaciones=("CountSesión", "count"),
+        TemasUnicos=("Tema", "nunique")
+    ).reset_index(drop=True)
+
+
+# ---- Top Dinamizadores ----
+def top_table(df_f):
+    df_f = with_infoplaza_full(df_f)
+    tabla = df_f.groupby(["_dinamizador_id","InfoplazaFull"], observed=True).agg(
+        Cédula=("_cedula_norm", "first"),
+        Nombre=("_nombre_unificado", "first"),
+        Participaciones=("_dinamizador_id", "size")
+    ).reset_index().rename(columns={"InfoplazaFull":"Infoplaza"})
+    tabla = tabla[["Cédula","Nombre","Infoplaza","Participaciones"]]
+    return tabla.sort_values("Participaciones", ascending=False, kind="stable")
+
+
+# ---- Participación por Infoplazas ----
+def infoplazas_tables(df, df_f, selections):
+    """
+    Devuelve (resumen por infoplaza, detalle por dinamizador, posiciones del detalle
+    por infoplaza), o None si no hay datos filtrados. `df` es la tabla completa (para
+    el catálogo maestro) y `df_f` la ya filtrada con `selections`.
+    """
+    if df_f.empty:
+        return None
+
+    # 1. PREPARACIÓN DE DATOS DE PARTICIPACIÓN (SIN CAMBIOS)
+    df_f = with_infoplaza_full(df_f)
+
+    summary_table = df_f.groupby("InfoplazaFull", observed=True).agg(
+        TotalSesiones=("CountSesión", "count"),
+        SesionesUnicas=("CountSesión", "nunique"),
+        DinamizadoresUnicos=("_dinamizador_id", "nunique")
+    ).reset_index()
+
+    detail_table = df_f.groupby(["InfoplazaFull", "_dinamizador_id"], observed=True).agg(
+        **{"Cédula": ("_cedula_norm", "first"), "Nombre del Dinamizador": ("_nombre_unificado", "first")},
+        TotalParticipacion=("CountSesión", "count"),
+        ParticipacionUnica=("CountSesión", "nunique")
+    ).reset_index().drop(columns="_dinamizador_id")
+
+    # 2. CATÁLOGO MAESTRO FILTRADO (LÓGICA MEJORADA)
+    # Se crea el catálogo maestro desde el DataFrame original `df` para tener la lista completa.
+    catalogo_maestro = df[["#", "INFOPLAZAS", "Regional", "Provincia"]].drop_duplicates().dropna()
+
+    # APLICAMOS LOS FILTROS DE LA BARRA LATERAL AL CATÁLOGO MAESTRO.
+    # Esto asegura que la lista de Infoplazas se ajusta a la selección del usuario.
+    if selections.get("Regional"):
+        catalogo_maestro = catalogo_maestro[catalogo_maestro["Regional"].isin(selections["Regional"])]
+    if selections.get("Provincia"):
+        catalogo_maestro = catalogo_maestro[catalogo_maestro["Provincia"].isin(selections["Provincia"])]
+
+    catalogo_maestro = with_infoplaza_full(catalogo_maestro)
+
+    # 3. UNIÓN FINAL (MERGE)
+    # Se une el catálogo ya filtrado con los datos de participación.
+    final_summary = pd.merge(
+        catalogo_maestro[["InfoplazaFull"]],
+        summary_table,
+        on="InfoplazaFull",
+        how="left"
+    ).fillna(0)
+
+    for col in ["TotalSesiones", "SesionesUnicas", "DinamizadoresUnicos"]:
+        final_summary[col] = final_summary[col].astype(int)
+
+    # El detalle de una infoplaza se toma por posición al seleccionarla, sin recorrer la tabla.
+    detail_positions = detail_table.groupby("InfoplazaFull", observed=True).indices
+    return final_summary, detail_table, detail_positions
@@ -0,0 +1,61 @@
+"""
+Esquema en memoria del DataFrame de respuestas.
+
+La hoja llega como texto en todas las columnas. Se aplica una sola vez en
+`get_data()`: las columnas repetitivas pasan a `category` (códigos enteros,
+así `groupby`/`isin` trabajan sobre enteros y no sobre strings), el año a un
+entero pequeño y la marca temporal a fecha real.
+"""
+import numpy as np
+import pandas as pd
+
+# Columnas con pocos valores distintos respecto al número de filas.
+CATEGORY_COLUMNS = [
+    "Regional", "Provincia", "Mes", "Facilitador", "INFOPLAZAS", "Tema", "#",
+    "CountSesión", "_cedula_norm", "_nombre_unificado", "InfoplazaFull",
+]
+INT_COLUMNS = {"Año": "Int16"}
+DATETIME_COLUMNS = ["Marca temporal"]
+
+# Formato de la marca temporal de Google Forms con configuración regional es.
+TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+
+def parse_timestamp(series):
+    out = pd.to_datetime(series, format=TIMESTAMP_FORMAT, errors="coerce")
+    pending = out.isna() & series.notna() & (series.astype(str).str.strip() != "")
+    # ISO ("2024-10-03 09:00:00", p. ej. un Parquet con fechas reales) antes que el formato libre,
+    # que con dayfirst intercambiaría el día y el mes.
+    if pending.any():
+        out[pending] = pd.to_datetime(series[pending], errors="coerce", format="ISO8601")
+        pending &= out.isna()
+    if pending.any():
+        out[pending] = pd.to_datetime(
+            series[pending], errors="coerce", dayfirst=True, format="mixed"
+        )
+    return out
+
+
+def _to_int(series, dtype):
+    """Entero con nulos; lo que no es número o no cabe en `dtype` (p. ej. un año mal escrito) queda nulo."""
+    values = pd.to_numeric(series, errors="coerce").round()
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    return values.where(values.between(info.min, info.max)).astype(dtype)
+
+
+def apply_schema(df):
+    """
+    Convierte las columnas conocidas a sus tipos compactos (las demás no se tocan).
+    Las que ya tienen su tipo se dejan como están: se puede volver a aplicar tras
+    agregar columnas.
+    """
+    for col, dtype in INT_COLUMNS.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = _to_int(df[col], dtype)
+    for col in DATETIME_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = parse_timestamp(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
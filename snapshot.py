@@ -0,0 +1,302 @@
+"""
+Snapshot local (Parquet) de la hoja de respuestas del formulario.
+
+La hoja solo recibe filas nuevas al final (es el destino de un Google Form),
+así que basta con guardar localmente lo ya descargado junto con el número de
+filas sincronizadas y un checksum de la última fila. En cada refresco se piden
+solo las filas posteriores; si el encabezado o el checksum no coinciden se
+hace una recarga completa.
+
+Con `columns` solo se descargan y guardan esas columnas de la hoja: una sola
+llamada `batch_get` con un rango por cada bloque de columnas contiguas. Los
+valores se piden sin formato (números sin separadores regionales) y las fechas
+como texto, igual que se ven en la hoja.
+
+Estructura en disco:
+    <dir>/meta.json           -> encabezado, columnas, filas sincronizadas, checksum, partes
+    <dir>/part-00000.parquet  -> bloques de filas en el orden de la hoja
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+META_FILE = "meta.json"
+META_VERSION = 1
+# Con demasiadas partes la lectura se vuelve lenta; se compactan en una sola.
+MAX_PARTS = 32
+# Opciones de lectura de la API de Google Sheets (gspread las pasa tal cual).
+RENDER_OPTIONS = {"value_render_option": "UNFORMATTED_VALUE", "date_time_render_option": "FORMATTED_STRING"}
+
+
+def row_checksum(values):
+    """Checksum estable de una fila de la hoja (lista de strings)."""
+    joined = "\x1f".join("" if v is None else str(v) for v in values)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def _strip_trailing(values):
+    values = list(values)
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+def _cell(value):
+    return "" if value is None else str(value)
+
+
+def _fit_row(values, width):
+    """Rellena o recorta una fila a `width` columnas (la API omite vacíos finales)."""
+    values = [_cell(v) for v in values[:width]]
+    return values + [""] * (width - len(values))
+
+
+def _column_letter(index):
+    """Letra A1 de la columna `index` (0 = A, 26 = AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def _positions(header, columns):
+    """Posiciones en la hoja de las columnas de `columns` que existen (la primera si se repiten)."""
+    wanted, seen, positions = set(columns), set(), []
+    for i, name in enumerate(header):
+        if name in wanted and name not in seen:
+            seen.add(name)
+            positions.append(i)
+    return positions
+
+
+def _runs(positions):
+    """Bloques de posiciones contiguas: [(primera, última)]."""
+    runs = []
+    for p in positions:
+        if runs and p == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], p)
+        else:
+            runs.append((p, p))
+    return runs
+
+
+def snapshot_matches(meta, columns):
+    """Si el snapshot se guardó con las mismas `columns` pedidas (None = todas)."""
+    return meta.get("columns") == (list(columns) if columns is not None else None)
+
+
+def read_meta(directory):
+    try:
+        with open(Path(directory) / META_FILE, encoding="utf-8") as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != META_VERSION:
+        return None
+    return meta
+
+
+def _write_meta(directory, meta):
+    path = Path(directory) / META_FILE
+    # Nombre temporal único: dos escritores nunca comparten el mismo archivo a medio escribir.
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=META_FILE + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, ensure_ascii=False)
+        os.replace(tmp, path)  # reemplazo atómico
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def read_snapshot(directory):
+    """Devuelve (df, meta) del snapshot, o (None, None) si no existe o está dañado."""
+    meta = read_meta(directory)
+    if meta is None:
+        return None, None
+    try:
+        parts = [pd.read_parquet(Path(directory) / name) for name in meta["parts"]]
+    except Exception:
+        return None, None
+    if parts:
+        df = pd.concat(parts, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=[f"c{i}" for i in range(len(meta["header"]))])
+    if len(df) != meta["rows"] or df.shape[1] != len(meta["header"]):
+        return None, None
+    df.columns = meta["header"]
+    return df, meta
+
+
+def _write_part(directory, index, df):
+    # Las columnas se guardan por posición: la hoja puede tener encabezados
+    # vacíos o repetidos, que Parquet no admite. El encabezado real va en el meta.
+    name = f"part-{index:05d}.parquet"
+    positional = df.set_axis([f"c{i}" for i in range(df.shape[1])], axis=1)
+    positional.to_parquet(Path(directory) / name, index=False)
+    return name
+
+
+def write_snapshot(directory, df, sheet_header=None, columns=None, positions=None):
+    """
+    Reescribe el snapshot completo con `df`. Si solo tiene algunas columnas de la
+    hoja, `sheet_header` es el encabezado completo, `columns` las pedidas y
+    `positions` dónde está cada columna de `df` en la hoja.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    old = read_meta(directory)
+    # Índice nuevo para no pisar partes que el meta anterior aún referencia.
+    start = _next_part_index(old)
+    parts = [_write_part(directory, start, df)] if len(df) else []
+    meta = {
+        "version": META_VERSION,
+        "header": list(df.columns),
+        "sheet_header": list(sheet_header) if sheet_header is not None else list(df.columns),
+        "columns": list(columns) if columns is not None else None,
+        "positions": positions,
+        "rows": len(df),
+        "last_row_checksum": row_checksum(df.iloc[-1].tolist()) if len(df) else None,
+        "parts": parts,
+    }
+    _write_meta(directory, meta)
+    _remove_unreferenced(directory, meta)
+    return meta
+
+
+def append_snapshot(directory, meta, new_df):
+    """Agrega `new_df` como una parte nueva y actualiza el meta."""
+    meta = dict(meta)
+    meta["parts"] = meta["parts"] + [_write_part(directory, _next_part_index(meta), new_df)]
+    meta["rows"] = meta["rows"] + len(new_df)
+    meta["last_row_checksum"] = row_checksum(new_df.iloc[-1].tolist())
+    _write_meta(directory, meta)
+    return meta
+
+
+def _next_part_index(meta):
+    if not meta or not meta.get("parts"):
+        return 0
+    return max(int(name[5:10]) for name in meta["parts"]) + 1
+
+
+def _remove_unreferenced(directory, meta):
+    for path in Path(directory).glob("part-*.parquet"):
+        if path.name not in meta["parts"]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def _frame(rows, header):
+    width = len(header)
+    return pd.DataFrame([_fit_row(r, width) for r in rows], columns=header)
+
+
+def _read(ws, first, last, header, positions, with_header=False):
+    """
+    Lee las filas `first`..`last` de la hoja (1 = encabezado) en una sola llamada
+    `batch_get`, solo las columnas `positions` (None = todas), como un DataFrame
+    de texto con las columnas `header`. Con `with_header` también pide la fila 1
+    y devuelve `(encabezado de la hoja, df)`.
+    """
+    ranges = ["1:1"] if with_header else []
+    if positions is None:
+        ranges.append(f"{first}:{last}")
+        results = ws.batch_get(ranges, **RENDER_OPTIONS)
+        sheet_header = [_cell(v) for v in (results[0][0] if results[0] else [])] if with_header else None
+        df = _frame(results[-1], header)
+    else:
+        runs = _runs(positions)
+        ranges += [f"{_column_letter(a)}{first}:{_column_letter(b)}{last}" for a, b in runs]
+        # Por columnas: cada rango devuelve una lista por columna (sin las celdas vacías del final).
+        results = ws.batch_get(ranges, major_dimension="COLUMNS", **RENDER_OPTIONS)
+        sheet_header = [_cell(col[0]) if col else "" for col in results[0]] if with_header else None
+        columns = []
+        for (a, b), result in zip(runs, results[len(ranges) - len(runs):]):
+            result = list(result) + [[]] * (b - a + 1 - len(result))
+            columns.extend(result[:b - a + 1])
+        rows = max((len(c) for c in columns), default=0)
+        df = pd.DataFrame(
+            {i: [_cell(v) for v in c] + [""] * (rows - len(c)) for i, c in enumerate(columns)},
+            index=pd.RangeIndex(rows),
+        )
+        df.columns = header
+    return (sheet_header, df) if with_header else df
+
+
+def fetch_sheet(ws, columns=None):
+    """
+    Descarga toda la hoja (o solo `columns`) sin tocar el snapshot. Devuelve
+    `(df, encabezado de la hoja, posiciones)`. Una hoja sin encabezado o sin
+    ninguna de las columnas pedidas es un error: así no reemplaza a los últimos
+    datos buenos.
+    """
+    if columns is None:
+        data = ws.get_all_values(**RENDER_OPTIONS)
+        if not data:
+            raise ValueError("La hoja está vacía (sin encabezado)")
+        header = [_cell(v) for v in data[0]]
+        return _frame(data[1:], header), header, None
+    header_rng = ws.batch_get(["1:1"], **RENDER_OPTIONS)[0]
+    sheet_header = [_cell(v) for v in (header_rng[0] if header_rng else [])]
+    positions = _positions(sheet_header, columns)
+    if not positions:
+        raise ValueError(f"La hoja no tiene ninguna de las columnas esperadas: {', '.join(columns)}")
+    df = _read(ws, 2, max(ws.row_count, 2), [sheet_header[p] for p in positions], positions)
+    return df, sheet_header, positions
+
+
+def full_reload(ws, directory, columns=None):
+    """Descarga toda la hoja (o solo `columns`) y reescribe el snapshot."""
+    df, sheet_header, positions = fetch_sheet(ws, columns)
+    write_snapshot(directory, df, sheet_header, columns, positions)
+    return df
+
+
+def sync_worksheet(ws, directory, columns=None):
+    """
+    Sincroniza el snapshot local con la hoja `ws` y devuelve el DataFrame completo
+    (solo `columns`, si se indican).
+
+    Solo se descargan el encabezado, la última fila ya sincronizada (para
+    validar su checksum) y las filas nuevas, en una sola llamada. Cualquier
+    inconsistencia (encabezado distinto, checksum distinto, filas borradas,
+    otras columnas pedidas) provoca una recarga completa.
+    """
+    df, meta = read_snapshot(directory)
+    if df is None or meta["rows"] == 0 or not snapshot_matches(meta, columns):
+        return full_reload(ws, directory, columns)
+
+    synced = meta["rows"]
+    # Fila 1 = encabezado; la fila de datos i está en la fila i + 1 de la hoja.
+    last_synced_row = synced + 1
+    if ws.row_count < last_synced_row:
+        return full_reload(ws, directory, columns)
+
+    header, tail = _read(ws, last_synced_row, ws.row_count, meta["header"], meta.get("positions"),
+                         with_header=True)
+    if _strip_trailing(header) != _strip_trailing(meta.get("sheet_header", meta["header"])):
+        return full_reload(ws, directory, columns)
+
+    if tail.empty:
+        return full_reload(ws, directory, columns)
+    if row_checksum(tail.iloc[0].tolist()) != meta["last_row_checksum"]:
+        return full_reload(ws, directory, columns)
+
+    new_df = tail.iloc[1:].reset_index(drop=True)
+    if new_df.empty:
+        return df
+
+    meta = append_snapshot(directory, meta, new_df)
+    df = pd.concat([df, new_df], ignore_index=True)
+    if len(meta["parts"]) > MAX_PARTS:
+        write_snapshot(directory, df, meta.get("sheet_header"), meta.get("columns"), meta.get("positions"))
+    return df
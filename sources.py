@@ -0,0 +1,286 @@
+"""
+Fuentes de datos de la hoja de respuestas.
+
+Todas tienen un método `load()` que devuelve la hoja como un DataFrame de
+texto, con el encabezado como columnas y "" en las celdas vacías (lo mismo que
+entrega Google Sheets), listo para `dataset.prepare_dataset()`, y un método
+`token(df)` que identifica esos datos: dos cargas con el mismo token traen lo
+mismo y no hace falta volver a prepararlas (ver `refresher.build_if_changed`).
+
+- `GoogleSheetSource`: la hoja real, con credenciales de cuenta de servicio.
+  Varias hojas pueden compartir un mismo `GoogleClient` autorizado. Con
+  `columns` solo se descargan esas columnas (ver snapshot.py).
+- `WorksheetSource`: cualquier objeto con la interfaz de `gspread.Worksheet`
+  usada aquí, por ejemplo `FakeWorksheet`.
+- `FileSource`: un archivo local CSV o Parquet.
+- `FakeWorksheet`: una hoja en memoria para pruebas y benchmarks sin Google.
+
+Toda llamada a la API se reintenta con espera exponencial ante errores de cuota
+(429) o del servidor (5xx); los demás errores se propagan de inmediato.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+from instrument import stage
+from snapshot import (
+    _strip_trailing, fetch_sheet, full_reload, read_snapshot, row_checksum, snapshot_matches, sync_worksheet,
+)
+
+GOOGLE_SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+]
+# Columnas de la hoja que usa el informe ("Infoplaza" solo se consulta para mostrar el Top).
+REPORT_COLUMNS = [
+    "Marca temporal", "Cédula", "Nombre y apellido", "Año", "Mes", "Regional", "Provincia",
+    "Facilitador", "#", "INFOPLAZAS", "Infoplaza", "CountSesión", "Tema",
+]
+# Reintentos ante 429/5xx: esperas de ~1, 2, 4, 8 y 16 s (con variación al azar), o lo que
+# indique la cabecera Retry-After.
+RETRIES = 5
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 32.0
+
+
+def _retryable(error):
+    """Código HTTP del error si vale la pena reintentar (429 o 5xx), o None."""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if status == 429 or (status is not None and 500 <= status < 600) else None
+
+
+def with_retries(call):
+    """Llama a `call()` y la reintenta con espera exponencial ante errores 429/5xx."""
+    for attempt in range(RETRIES + 1):
+        try:
+            return call()
+        except Exception as e:
+            status = _retryable(e)
+            if status is None or attempt == RETRIES:
+                raise
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1)
+            retry_after = getattr(e.response, "headers", {}).get("Retry-After", "")
+            if str(retry_after).isdigit():
+                delay = max(delay, min(RETRY_MAX_SECONDS, float(retry_after)))
+            with stage(f"retry:{status}"):
+                time.sleep(delay)
+
+
+class RetryingWorksheet:
+    """La parte de `gspread.Worksheet` que usa la app, con `with_retries` en cada llamada."""
+
+    def __init__(self, ws):
+        self._ws = ws
+
+    @property
+    def row_count(self):
+        return self._ws.row_count
+
+    def batch_get(self, ranges, **kwargs):
+        return with_retries(lambda: self._ws.batch_get(ranges, **kwargs))
+
+    def get_all_values(self, **kwargs):
+        return with_retries(lambda: self._ws.get_all_values(**kwargs))
+
+
+def load_worksheet(ws, sync_mode="incremental", snapshot_dir=None, columns=None):
+    """
+    Lee `ws` completa, o solo `columns`. Con "incremental" solo descarga las filas
+    nuevas y las agrega al snapshot local de `snapshot_dir`; con "full" descarga
+    toda la hoja; con "frozen" (hojas que ya no cambian) usa el snapshot sin
+    consultar la hoja y solo la descarga si no hay snapshot.
+
+    `ws` también puede ser una función que abre la hoja; solo se llama si hace
+    falta consultarla. Un error (tras los reintentos) se propaga: nunca se
+    devuelve una hoja vacía en su lugar.
+    """
+    def open_ws():
+        return RetryingWorksheet(with_retries(ws) if callable(ws) else ws)
+
+    with stage("fetch") as s:
+        if sync_mode == "frozen":
+            df, meta = read_snapshot(snapshot_dir)
+            if df is None or not snapshot_matches(meta, columns):
+                df = full_reload(open_ws(), snapshot_dir, columns)
+        elif sync_mode == "incremental":
+            df = sync_worksheet(open_ws(), snapshot_dir, columns)
+        else:
+            df, _, _ = fetch_sheet(open_ws(), columns)
+        s.rows_out = len(df)
+    return df
+
+
+def data_token(df, exact=False):
+    """
+    Token de una carga. Como el snapshot, usa el encabezado, las filas y la suma de
+    la última fila (las respuestas solo se agregan al final); con `exact` también
+    una huella de todo el contenido, para las fuentes que se leen completas.
+    """
+    token = (tuple(df.columns), len(df), row_checksum(df.iloc[-1].tolist()) if len(df) else None)
+    if exact:
+        token += (hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest(),)
+    return token
+
+
+class WorksheetSource:
+    def __init__(self, ws, sync_mode="incremental", snapshot_dir=None, columns=None):
+        self.ws = ws
+        self.sync_mode = sync_mode
+        self.snapshot_dir = snapshot_dir
+        self.columns = columns
+
+    def load(self):
+        return load_worksheet(self.ws, self.sync_mode, self.snapshot_dir, self.columns)
+
+    def token(self, df):
+        # "full" vuelve a leer la hoja entera y también ve celdas editadas en filas anteriores.
+        return data_token(df, exact=self.sync_mode == "full")
+
+
+class GoogleClient:
+    """Cliente de gspread que se autoriza una sola vez, al primer uso, y se comparte entre hojas e hilos."""
+
+    def __init__(self, credentials_info):
+        self.credentials_info = credentials_info
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._client is None:
+                # Importados aquí para que las demás fuentes no requieran las librerías de Google.
+                import gspread
+                from google.oauth2.service_account import Credentials
+
+                creds = Credentials.from_service_account_info(self.credentials_info, scopes=GOOGLE_SCOPES)
+                self._client = gspread.authorize(creds)
+            return self._client
+
+
+class GoogleSheetSource:
+    def __init__(self, credentials_info, sheet_id, sheet_name, sync_mode="incremental", snapshot_dir=None,
+                 client=None, columns=None):
+        self.credentials_info = credentials_info
+        self.sheet_id = sheet_id
+        self.sheet_name = sheet_name
+        self.sync_mode = sync_mode
+        self.snapshot_dir = snapshot_dir
+        self.client = client or GoogleClient(credentials_info)
+        self.columns = columns
+
+    def worksheet(self):
+        return self.client.get().open_by_key(self.sheet_id).worksheet(self.sheet_name)
+
+    def load(self):
+        return load_worksheet(self.worksheet, self.sync_mode, self.snapshot_dir, self.columns)
+
+    def token(self, df):
+        return data_token(df, exact=self.sync_mode == "full")
+
+
+class FileSource:
+    """Archivo `.csv` o `.parquet` con el mismo encabezado que la hoja."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self):
+        with stage("fetch") as s:
+            if self.path.suffix.lower() == ".parquet":
+                df = pd.read_parquet(self.path).fillna("").astype(str)
+            else:
+                df = pd.read_csv(self.path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+            s.rows_out = len(df)
+        return df
+
+    def token(self, df):
+        return data_token(df, exact=True)
+
+
+class FakeAPIError(Exception):
+    """Error HTTP de la API como lo expone gspread (`error.response.status_code`)."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status, headers=headers)
+
+
+class FakeWorksheet:
+    """
+    Hoja en memoria con la parte de la interfaz de `gspread.Worksheet` que usa
+    la app (`get_all_values`, `batch_get`, `row_count`). Como la API real, omite
+    las celdas vacías al final de cada fila (o columna) y de cada rango.
+
+    `fail(*status)` hace que las próximas llamadas fallen con esos códigos HTTP,
+    una por llamada. `calls` y `cells` cuentan las llamadas y las celdas
+    entregadas.
+    """
+
+    def __init__(self, values, extra_rows=0):
+        self._rows = [list(r) for r in values]
+        self.extra_rows = extra_rows  # filas vacías al final de la grilla
+        self._failures = []
+        self.calls = 0
+        self.cells = 0
+
+    @classmethod
+    def from_frame(cls, df, extra_rows=0):
+        return cls([list(df.columns)] + df.astype(str).values.tolist(), extra_rows)
+
+    @property
+    def row_count(self):
+        return len(self._rows) + self.extra_rows
+
+    def append_rows(self, rows):
+        self._rows.extend(list(r) for r in rows)
+
+    def fail(self, *statuses):
+        self._failures.extend(statuses)
+
+    def _call(self):
+        self.calls += 1
+        if self._failures:
+            raise FakeAPIError(self._failures.pop(0))
+
+    def get_all_values(self, **kwargs):
+        self._call()
+        width = max((len(r) for r in self._rows), default=0)
+        self.cells += width * len(self._rows)
+        return [r + [""] * (width - len(r)) for r in self._rows]
+
+    def batch_get(self, ranges, major_dimension=None, **kwargs):
+        self._call()
+        out = [self._get_range(rng, major_dimension == "COLUMNS") for rng in ranges]
+        self.cells += sum(len(v) for block in out for v in block)
+        return out
+
+    def _get_range(self, rng, by_columns):
+        # Filas completas ("3:10", 1 = encabezado) o un bloque de columnas ("C2:F10").
+        m = re.fullmatch(r"([A-Z]*)(\d+):([A-Z]*)(\d+)", rng)
+        if not m or bool(m.group(1)) != bool(m.group(3)):
+            raise ValueError(f"Rango no soportado: {rng}")
+        start, end = int(m.group(2)), int(m.group(4))
+        first = _column_index(m.group(1)) if m.group(1) else 0
+        last = _column_index(m.group(3)) + 1 if m.group(3) else None
+        block = [r[first:last] for r in self._rows[start - 1:end]]
+        if by_columns:
+            width = max((len(r) for r in block), default=0)
+            block = [[r[c] if c < len(r) else "" for r in block] for c in range(width)]
+        out = [_strip_trailing(v) for v in block]
+        while out and not out[-1]:
+            out.pop()  # la API no devuelve filas (o columnas) vacías al final
+        return out
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index - 1
@@ -0,0 +1,164 @@
+"""
+Motor SQL columnar (DuckDB) para las tablas de las secciones.
+
+Alternativa a las cadenas de filtros, `groupby` y `merge` de `reports.py`. Al
+crear el motor, el conjunto de datos ya preparado se carga una sola vez en una
+tabla de DuckDB en memoria: columnar y comprimida, con las categorías como
+ENUM (códigos enteros). Cada tabla de sección es una consulta con los filtros
+de la barra lateral en el WHERE, que DuckDB aplica al leer (y descarta bloques
+enteros con sus estadísticas min/max), en varios hilos. Devuelve lo mismo que
+`reports.py`, en el mismo orden; `bench/bench_engines.py` lo verifica.
+
+DuckDB es opcional: solo se importa al crear un `DuckDBEngine`.
+"""
+import numpy as np
+
+from filters import active_selections
+from reports import with_infoplaza_full
+
+# Columnas que usan las consultas; las demás no se cargan.
+COLUMNS = [
+    "Marca temporal", "Año", "Mes", "Regional", "Provincia", "Facilitador",
+    "#", "INFOPLAZAS", "CountSesión", "Tema", "_cedula_norm", "_nombre_unificado",
+    "_dinamizador_id",
+]
+
+
+def _quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _where(selections, base=()):
+    """Condiciones `columna IN (...)` de `selections` y sus parámetros."""
+    conditions = list(base)
+    params = []
+    for col, values in selections.items():
+        conditions.append(f"{_quote(col)} IN ({', '.join('?' * len(values))})")
+        params.extend(v.item() if isinstance(v, np.generic) else v for v in values)
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+class DuckDBEngine:
+    """
+    Consultas de las secciones sobre `df` (el DataFrame de `prepare_dataset`).
+    Se crea una vez por carga de datos y se comparte entre sesiones: cada
+    consulta usa su propio cursor sobre la misma base en memoria.
+
+    Los resultados se ordenan como los de pandas: por `_dinamizador_id`, las
+    categorías por su código (`enum_code`; `astype("category")` ordena las
+    categorías como texto) y los empates por la posición en la hoja.
+    """
+
+    def __init__(self, df, filter_index, threads=None):
+        import duckdb
+
+        self.filter_index = filter_index
+        data = df[[c for c in COLUMNS if c in df.columns]]
+        # _pos: posición en la hoja. _orden: posición al ordenar por Marca temporal de forma
+        # estable, con las fechas inválidas al final (como `sort_values(kind="stable")`).
+        orden = np.empty(len(df), dtype=np.int64)
+        if "Marca temporal" in data:
+            orden[np.argsort(data["Marca temporal"].to_numpy(), kind="stable")] = np.arange(len(df))
+        else:
+            orden[:] = np.arange(len(df))
+        # InfoplazaFull (precalculada al cargar) como categoría: se agrupa por su código.
+        full = with_infoplaza_full(df)["InfoplazaFull"].astype("category") if "#" in df else None
+        data = data.assign(_pos=np.arange(len(df)), _orden=orden, _infoplaza=full)
+        self._con = duckdb.connect()
+        if threads:
+            self._con.execute(f"SET threads = {int(threads)}")
+        self._con.register("datos", data)
+        self._con.execute("CREATE TABLE respuestas AS SELECT * FROM datos")
+        self._con.unregister("datos")
+
+    def _query(self, sql, params):
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, params).df()
+        finally:
+            cursor.close()
+
+    def _filtered(self, selections, *base):
+        return _where(active_selections(self.filter_index, selections), base)
+
+    # ---- Dinamizadores ----
+    def dinamizadores_table(self, selections):
+        where, params = self._filtered(selections, '"_dinamizador_id" IS NOT NULL')
+        # La infoplaza es la de la primera respuesta por Marca temporal (_orden).
+        return self._query(f"""
+            SELECT "Cédula", "Nombre", "Infoplaza", "Participaciones", "TemasUnicos" FROM (
+                SELECT "_dinamizador_id",
+                       any_value("_cedula_norm") AS "Cédula",
+                       any_value("_nombre_unificado") AS "Nombre",
+                       arg_min(_infoplaza, _orden) AS "Infoplaza",
+                       count("CountSesión") AS "Participaciones",
+                       count(DISTINCT "Tema") AS "TemasUnicos"
+                FROM respuestas{where}
+                GROUP BY "_dinamizador_id"
+            )
+            ORDER BY "_dinamizador_id"
+        """, params)
+
+    # ---- Top Dinamizadores ----
+    def top_table(self, selections):
+        where, params = self._filtered(selections, '"_dinamizador_id" IS NOT NULL')
+        return self._query(f"""
+            SELECT "Cédula", "Nombre", "Infoplaza", "Participaciones" FROM (
+                SELECT "_dinamizador_id", _infoplaza AS "Infoplaza",
+                       any_value("_cedula_norm") AS "Cédula", any_value("_nombre_unificado") AS "Nombre",
+                       count(*) AS "Participaciones"
+                FROM respuestas{where}
+                GROUP BY "_dinamizador_id", _infoplaza
+            )
+            ORDER BY "Participaciones" DESC, "_dinamizador_id", enum_code("Infoplaza")
+        """, params)
+
+    # ---- Participación por Infoplazas ----
+    def infoplazas_tables(self, selections):
+        """Mismo resultado que `reports.infoplazas_tables(df, df_f, selections)`."""
+        where, params = self._filtered(selections)
+        summary = self._query(f"""
+            SELECT _infoplaza AS "InfoplazaFull",
+                   count("CountSesión") AS "TotalSesiones",
+                   count(DISTINCT "CountSesión") AS "SesionesUnicas",
+                   count(DISTINCT "_dinamizador_id") AS "DinamizadoresUnicos"
+            FROM respuestas{where}
+            GROUP BY ALL
+        """, params)
+        if summary.empty:
+            return None
+
+        where, params = self._filtered(selections, '"_dinamizador_id" IS NOT NULL')
+        detail_table = self._query(f"""
+            SELECT "InfoplazaFull", "Cédula", "Nombre del Dinamizador",
+                   "TotalParticipacion", "ParticipacionUnica" FROM (
+                SELECT _infoplaza AS "InfoplazaFull", "_dinamizador_id",
+                       any_value("_cedula_norm") AS "Cédula",
+                       any_value("_nombre_unificado") AS "Nombre del Dinamizador",
+                       count("CountSesión") AS "TotalParticipacion",
+                       count(DISTINCT "CountSesión") AS "ParticipacionUnica"
+                FROM respuestas{where}
+                GROUP BY _infoplaza, "_dinamizador_id"
+            )
+            ORDER BY enum_code("InfoplazaFull"), "_dinamizador_id"
+        """, params)
+
+        # Catálogo maestro: cada combinación de la tabla completa, en orden de aparición,
+        # con los filtros de Regional y Provincia tal como se eligieron.
+        catalog = {col: selections[col] for col in ("Regional", "Provincia") if selections.get(col)}
+        not_null = [f"{_quote(c)} IS NOT NULL" for c in ("#", "INFOPLAZAS", "Regional", "Provincia")]
+        where, params = _where(catalog, not_null)
+        catalogo = self._query(f"""
+            SELECT "InfoplazaFull" FROM (
+                SELECT any_value(_infoplaza) AS "InfoplazaFull", min(_pos) AS primera
+                FROM respuestas{where}
+                GROUP BY "#", "INFOPLAZAS", "Regional", "Provincia"
+            )
+            ORDER BY primera
+        """, params)
+
+        final_summary = catalogo.merge(summary, on="InfoplazaFull", how="left").fillna(0)
+        for col in ["TotalSesiones", "SesionesUnicas", "DinamizadoresUnicos"]:
+            final_summary[col] = final_summary[col].astype(int)
+        detail_positions = detail_table.groupby("InfoplazaFull", observed=True).indices
+        return final_summary, detail_table, detail_positions
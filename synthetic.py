@@ -0,0 +1,125 @@
+"""
+Generador de respuestas sintéticas del formulario, con el mismo encabezado y
+formato de texto que la hoja real.
+
+Cada sesión (CountSesión) tiene fecha, tema y facilitador; cada dinamizador
+pertenece a una infoplaza (#, INFOPLAZAS, Regional, Provincia) y escribe su
+cédula y su nombre con variaciones (espacios, guiones, puntos, mayúsculas),
+como pasa en las respuestas reales.
+
+Uso:
+    python synthetic.py --rows 100000 --out .cache/sinteticos-100k.parquet
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HEADER = [
+    "Marca temporal", "Cédula", "Nombre y apellido", "Año", "Mes", "Regional", "Provincia",
+    "#", "INFOPLAZAS", "Infoplaza", "CountSesión", "Tema", "Facilitador",
+]
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio",
+         "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+PROVINCIAS = {
+    "Regional Metropolitana": ["Panamá", "Panamá Oeste"],
+    "Regional Central": ["Coclé", "Herrera", "Los Santos", "Veraguas"],
+    "Regional Occidental": ["Chiriquí", "Bocas del Toro"],
+    "Regional Oriental": ["Colón", "Darién"],
+    "Regional Comarcal": ["Guna Yala", "Ngäbe-Buglé", "Emberá"],
+}
+NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Carlos", "Rosa", "Juan", "Elena", "Pedro",
+           "Lucía", "Miguel", "Isabel", "Jorge", "Marta", "Raúl", "Sofía", "Diego", "Laura", "Iván"]
+APELLIDOS = ["González", "Rodríguez", "Pérez", "Sánchez", "Martínez", "Castillo", "Batista",
+             "Vásquez", "Herrera", "Moreno", "Ríos", "Quintero", "Samaniego", "Chen", "Ortega"]
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def _pick(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def make_responses(rows, seed=0, infoplazas=300, years=(2023, 2024, 2025)):
+    """DataFrame de `rows` respuestas, todo como texto (igual que la hoja)."""
+    rng = np.random.default_rng(seed)
+    n_sessions = max(rows // 15, 1)
+    n_people = max(rows // 25, 1)
+
+    # Catálogo de infoplazas
+    regional_of = _pick(rng, list(PROVINCIAS), infoplazas)
+    provincia_of = np.array([PROVINCIAS[r][i % len(PROVINCIAS[r])] for i, r in enumerate(regional_of)], dtype=object)
+    nombre_plaza = np.array([f"Infoplaza {p}" for p in range(1, infoplazas + 1)], dtype=object)
+
+    # Sesiones: fecha, tema y facilitador
+    start = pd.Timestamp(f"{min(years)}-01-08").value // 10**9
+    end = pd.Timestamp(f"{max(years)}-12-15").value // 10**9
+    session_ts = rng.integers(start, end, n_sessions)
+    session_tema = _pick(rng, [f"Tema {t:02d}" for t in range(1, 81)], n_sessions)
+    facilitadores = [f"{n} {a}" for n, a in zip(NOMBRES[:12], APELLIDOS[:12])] + ["Agregar al listado"]
+    session_fac = _pick(rng, facilitadores, n_sessions)
+
+    # Dinamizadores: infoplaza, cédula y nombre
+    person_plaza = rng.integers(0, infoplazas, n_people)
+    ced_a = rng.integers(1, 14, n_people)
+    ced_b = rng.integers(100, 999, n_people)
+    ced_c = rng.integers(1, 9999, n_people)
+    person_name = (_pick(rng, NOMBRES, n_people) + " " + _pick(rng, APELLIDOS, n_people)).astype(object)
+
+    session = rng.integers(0, n_sessions, rows)
+    person = rng.integers(0, n_people, rows)
+    ts = pd.to_datetime(session_ts[session] + rng.integers(0, 3600, rows), unit="s")
+    plaza = person_plaza[person]
+
+    a = pd.Series(ced_a[person]).astype(str)
+    b = pd.Series(ced_b[person]).astype(str)
+    c = pd.Series(ced_c[person]).astype(str)
+    variant = rng.integers(0, 20, rows)
+    cedula = np.select(
+        [variant < 12, variant < 15, variant < 17, variant < 19],
+        [a + "-" + b + "-" + c, a + " " + b + " " + c, " " + a + "--" + b + "-" + c + ".", "PE-" + b + "-" + c],
+        default="",
+    )
+    nombre = pd.Series(person_name[person])
+    case = rng.integers(0, 10, rows)
+    nombre = nombre.where(case > 1, nombre.str.upper()).where(case != 9, nombre + " ")
+
+    plaza_num = pd.Series(plaza + 1).astype(str)
+    df = pd.DataFrame({
+        "Marca temporal": ts.strftime("%d/%m/%Y %H:%M:%S"),
+        "Cédula": cedula,
+        "Nombre y apellido": nombre.to_numpy(),
+        "Año": ts.year.astype(str),
+        "Mes": np.asarray(MESES, dtype=object)[ts.month - 1],
+        "Regional": regional_of[plaza],
+        "Provincia": provincia_of[plaza],
+        "#": plaza_num.to_numpy(),
+        "INFOPLAZAS": nombre_plaza[plaza],
+        "Infoplaza": (plaza_num + " - " + pd.Series(nombre_plaza[plaza])).to_numpy(),
+        "CountSesión": pd.Series(session).map("S-{:06d}".format).to_numpy(),
+        "Tema": session_tema[session],
+        "Facilitador": session_fac[session],
+    }, columns=HEADER)
+    # La hoja de un formulario está en orden de llegada.
+    return df.take(np.argsort(ts.to_numpy(), kind="stable")).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="100k", help="número de filas o 10k/100k/1m")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="archivo .csv o .parquet")
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.rows.lower()) or int(args.rows)
+    df = make_responses(rows, seed=args.seed)
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    if args.out.lower().endswith(".parquet"):
+        df.to_parquet(args.out, index=False)
+    else:
+        df.to_csv(args.out, index=False, encoding="utf-8-sig")
+    print(f"{len(df):,} filas -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del informe están en la raíz del repositorio (como en bench/).
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
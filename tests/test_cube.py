@@ -0,0 +1,83 @@
+"""
+KPIs y gráficos de la pestaña KPI desde el cubo (`reports.kpi_data`) frente a
+`nunique`/`groupby` sobre las filas filtradas (la implementación anterior). La
+medición está en bench/bench_cube.py.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import reports
+from dataset import prepare_dataset
+from filters import filter_frame
+from synthetic import make_responses
+
+# gráfico -> (columna contada, agrupación, nombre de la columna)
+CHARTS = {
+    "g1": ("CountSesión", ["Año", "Mes"], "Sesiones"),
+    "g2": ("_dinamizador_id", ["Año", "Mes"], "Dinamizadores"),
+    "g3": ("_dinamizador_id", ["Regional"], "Dinamizadores"),
+    "g4": ("_dinamizador_id", ["Provincia"], "Dinamizadores"),
+}
+
+
+def legacy_kpis(df_f):
+    kpis = {
+        "total_registros": len(df_f),
+        "sesiones_unicas": df_f["CountSesión"].nunique(),
+        "din_uniq": df_f["_dinamizador_id"].nunique(),
+        "inf_uniq": df_f["#"].nunique(),
+        "temas_uniq": df_f["Tema"].nunique(),
+    }
+    charts = {name: df_f.groupby(by, observed=True)[col].nunique().reset_index(name=label)
+              for name, (col, by, label) in CHARTS.items()}
+    return kpis, charts
+
+
+@pytest.fixture(scope="module")
+def data():
+    raw = make_responses(3000, seed=7)
+    rng = np.random.default_rng(7)
+    for col, share in [("Regional", 0.03), ("Cédula", 0.03), ("Tema", 0.02), ("#", 0.01)]:
+        raw.loc[rng.random(len(raw)) < share, col] = ""
+    df, filter_index, cube = prepare_dataset(raw)
+    return df, filter_index, cube
+
+
+def _check(data, selections):
+    df, filter_index, cube = data
+    kpis, charts = reports.kpi_data(cube, selections)
+    old_kpis, old_charts = legacy_kpis(filter_frame(df, filter_index, selections))
+    assert kpis == old_kpis
+    assert charts.keys() == old_charts.keys()
+    for name, chart in charts.items():
+        pd.testing.assert_frame_equal(chart, old_charts[name], check_dtype=False, check_categorical=False)
+
+
+def test_all_selected(data):
+    _, filter_index, _ = data
+    _check(data, {c: list(e["options"]) for c, e in filter_index["columns"].items()})
+
+
+def test_no_selection(data):
+    _check(data, {})
+
+
+def test_selection_without_rows(data):
+    _check(data, {"Regional": ["Regional inexistente"]})
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_selections(data, seed):
+    _, filter_index, _ = data
+    rnd = random.Random(seed)
+    selections = {}
+    for col, entry in filter_index["columns"].items():
+        options = list(entry["options"])
+        if rnd.random() < 0.5:
+            selections[col] = rnd.sample(options, rnd.randint(1, max(1, len(options) // 2)))
+        else:
+            selections[col] = options
+    _check(data, selections)
@@ -0,0 +1,160 @@
+"""
+Descarga de la hoja contra `FakeWorksheet`: proyección de columnas,
+sincronización incremental en una llamada y sus recargas completas cuando la
+hoja cambió de otra forma, reintentos y conservación de los últimos datos
+buenos. Los tiempos están en bench/bench_fetch.py.
+"""
+import numpy as np
+import pytest
+
+import snapshot
+import sources
+from dataset import load_dataset
+from refresher import DatasetRefresher
+from sources import REPORT_COLUMNS, FakeAPIError, FakeWorksheet, WorksheetSource, load_worksheet
+from synthetic import make_responses
+
+ROWS = 600
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    # Sin esperas reales entre reintentos.
+    monkeypatch.setattr(sources, "RETRY_BASE_SECONDS", 0.0)
+
+
+@pytest.fixture(scope="module")
+def raw():
+    """Respuestas con preguntas que el informe no usa intercaladas entre sus columnas."""
+    raw = make_responses(ROWS, seed=3)
+    rng = np.random.default_rng(3)
+    for i in range(6):
+        raw.insert(int(rng.integers(0, raw.shape[1] + 1)), f"Pregunta {i + 1}",
+                   np.where(rng.random(ROWS) < 0.3, "", f"respuesta {i + 1}"))
+    return raw
+
+
+def test_projection_matches_full_sheet(raw):
+    ws = FakeWorksheet.from_frame(raw)
+    full = load_worksheet(ws, "full")
+    cells_full, ws.cells = ws.cells, 0
+    projected = load_worksheet(ws, "full", columns=REPORT_COLUMNS)
+    assert list(projected.columns) == [c for c in raw.columns if c in REPORT_COLUMNS]
+    assert full[list(projected.columns)].equals(projected)
+    assert ws.cells < cells_full
+
+
+def test_incremental_sync_uses_one_call(raw, tmp_path):
+    split = ROWS - 25
+    ws = FakeWorksheet.from_frame(raw.iloc[:split], extra_rows=50)
+    load_worksheet(ws, "incremental", tmp_path, REPORT_COLUMNS)
+    ws.append_rows(raw.iloc[split:].astype(str).values.tolist())
+    ws.calls = 0
+    synced = load_worksheet(ws, "incremental", tmp_path, REPORT_COLUMNS)
+    assert ws.calls == 1
+    assert synced.equals(load_worksheet(FakeWorksheet.from_frame(raw), "full", columns=REPORT_COLUMNS))
+
+
+def _values(df):
+    return [list(df.columns)] + df.astype(str).values.tolist()
+
+
+@pytest.fixture
+def reloads(monkeypatch):
+    """Cuenta las recargas completas que hace `sync_worksheet`."""
+    calls = []
+    full_reload = snapshot.full_reload
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return full_reload(*args, **kwargs)
+
+    monkeypatch.setattr(snapshot, "full_reload", counted)
+    return calls
+
+
+def _changed_header(values):
+    values[0] = [f"{c} (editada)" if c.startswith("Pregunta") else c for c in values[0]]
+    return values
+
+
+def _changed_last_row(values):
+    col = values[0].index("Nombre y apellido")
+    values[-1][col] += " (corregido)"
+    return values
+
+
+def _deleted_row(values):
+    return values[:10] + values[11:]
+
+
+CHANGES = {
+    "encabezado distinto": (_changed_header, REPORT_COLUMNS, 0),
+    "última fila editada": (_changed_last_row, REPORT_COLUMNS, 0),
+    "filas borradas": (_deleted_row, REPORT_COLUMNS, 5),
+    "otras columnas": (lambda values: values, None, 0),
+    "hoja más corta": (lambda values: values[:-40], REPORT_COLUMNS, 0),
+}
+
+
+@pytest.mark.parametrize("name", CHANGES)
+def test_incremental_falls_back_to_full_reload(raw, tmp_path, reloads, name):
+    change, columns, appended = CHANGES[name]
+    synced = raw.iloc[:ROWS - 50]
+    load_worksheet(FakeWorksheet(_values(synced)), "incremental", tmp_path, REPORT_COLUMNS)
+    reloads.clear()
+
+    values = change(_values(synced))
+    values += _values(raw.iloc[ROWS - 50:ROWS - 50 + appended])[1:]
+    got = load_worksheet(FakeWorksheet(values), "incremental", tmp_path, columns)
+    assert len(reloads) == 1
+    assert got.equals(load_worksheet(FakeWorksheet(values), "full", columns=columns))
+    # El snapshot recargado vuelve a sincronizar solo lo nuevo.
+    reloads.clear()
+    values += _values(raw.iloc[ROWS - 5:])[1:]
+    got = load_worksheet(FakeWorksheet(values), "incremental", tmp_path, columns)
+    assert not reloads
+    assert got.equals(load_worksheet(FakeWorksheet(values), "full", columns=columns))
+
+
+def test_clean_append_does_not_reload(raw, tmp_path, reloads):
+    load_worksheet(FakeWorksheet(_values(raw.iloc[:ROWS - 50])), "incremental", tmp_path, REPORT_COLUMNS)
+    reloads.clear()
+    load_worksheet(FakeWorksheet(_values(raw)), "incremental", tmp_path, REPORT_COLUMNS)
+    assert not reloads
+
+
+@pytest.mark.parametrize("statuses", [(429,), (503,), (429, 500, 503)])
+def test_retries_quota_and_server_errors(raw, statuses):
+    ws = FakeWorksheet.from_frame(raw)
+    load_worksheet(ws, "full", columns=REPORT_COLUMNS)
+    calls, ws.calls = ws.calls, 0
+    ws.fail(*statuses)
+    assert len(load_worksheet(ws, "full", columns=REPORT_COLUMNS)) == ROWS
+    assert ws.calls == calls + len(statuses)  # una llamada más por cada error
+
+
+def test_does_not_retry_forbidden(raw):
+    ws = FakeWorksheet.from_frame(raw)
+    ws.fail(403)
+    with pytest.raises(FakeAPIError):
+        load_worksheet(ws, "full", columns=REPORT_COLUMNS)
+    assert ws.calls == 1
+
+
+def test_refresher_keeps_last_good_data(raw, tmp_path):
+    ws = FakeWorksheet.from_frame(raw.iloc[:500])
+    source = WorksheetSource(ws, "incremental", tmp_path, REPORT_COLUMNS)
+    refresher = DatasetRefresher(lambda: load_dataset(source), interval=3600)
+    version, (df, _, _) = refresher.get()
+
+    ws.append_rows(raw.iloc[500:510].astype(str).values.tolist())
+    ws.fail(*[503] * (sources.RETRIES + 1))
+    assert not refresher.refresh(timeout=30)
+    after, (df_after, _, _) = refresher.get()
+    assert after == version and df_after is df
+    assert isinstance(refresher.last_error, FakeAPIError)
+
+    assert refresher.refresh(timeout=30)
+    assert refresher.last_error is None
+    assert len(refresher.get()[1][0]) == 510
@@ -0,0 +1,78 @@
+"""
+Índice de bitmaps de `filters.py` frente al filtrado con `isin` por columna
+(la implementación anterior), sobre respuestas sintéticas con celdas vacías y
+"Agregar al listado". La medición está en bench/bench_filters.py.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from filters import FILTER_COLUMNS, build_filter_index, filter_frame, filter_positions
+from schema import apply_schema
+from synthetic import make_responses
+
+
+def legacy_filter(df, selections):
+    df_f = df
+    for col, selected in selections.items():
+        if selected:
+            df_f = df_f[df_f[col].isin(selected)]
+    return df_f
+
+
+@pytest.fixture(scope="module")
+def data():
+    raw = make_responses(3000, seed=5)
+    rng = np.random.default_rng(5)
+    raw.loc[rng.random(len(raw)) < 0.03, "Regional"] = ""
+    raw.loc[rng.random(len(raw)) < 0.02, "Año"] = ""
+    df = apply_schema(raw)
+    return df, build_filter_index(df)
+
+
+def _everything(index):
+    return {col: list(index["columns"][col]["options"]) for col in FILTER_COLUMNS}
+
+
+def test_hidden_values_are_not_options(data):
+    _, index = data
+    for col in FILTER_COLUMNS:
+        assert not {"", "Agregar al listado"} & set(map(str, index["columns"][col]["options"]))
+
+
+def test_all_selected_drops_hidden_and_blank_rows(data):
+    df, index = data
+    selections = _everything(index)
+    got = filter_frame(df, index, selections)
+    pd.testing.assert_index_equal(got.index, legacy_filter(df, selections).index)
+    assert len(got) < len(df)  # vacíos y "Agregar al listado" quedan fuera, como antes
+
+
+def test_no_active_filters_returns_frame_as_is(data):
+    df, index = data
+    assert filter_positions(index, {col: [] for col in FILTER_COLUMNS}) is None
+    assert filter_frame(df, index, {}) is df
+
+
+def test_unknown_values_select_nothing(data):
+    df, index = data
+    assert len(filter_frame(df, index, {"Regional": ["Regional inexistente"]})) == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_selections_match_isin(data, seed):
+    df, index = data
+    rnd = random.Random(seed)
+    selections = {}
+    for col, options in _everything(index).items():
+        kind = rnd.random()
+        if kind < 0.3:
+            selections[col] = options
+        elif kind < 0.4:
+            selections[col] = []
+        else:
+            selections[col] = rnd.sample(options, rnd.randint(1, max(1, len(options) // 2)))
+    got = filter_frame(df, index, selections)
+    pd.testing.assert_index_equal(got.index, legacy_filter(df, selections).index)
@@ -0,0 +1,114 @@
+"""
+Índice persistente de dinamizadores (`identities.py`): claves canónicas, nombre
+de la primera respuesta, IDs estables entre actualizaciones incrementales y
+reinicios, y reprocesamiento cuando la hoja cambió de otra forma.
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from identities import META_FILE, IdentityIndex
+
+COLUMNS = ["Marca temporal", "Cédula", "Nombre y apellido"]
+ROWS = [
+    ["3/10/2024 9:00:00", "8-123-456", "Ana Pérez"],
+    ["3/10/2024 9:05:00", "08-0123-00456", "ana perez"],
+    ["4/10/2024 10:00:00", "4-55-901", "José Batista"],
+    ["5/10/2024 11:00:00", "", "Sin Cédula"],
+    ["6/10/2024 8:30:00", " 8 123 456.", "ANA PÉREZ"],
+]
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def ids(index, df):
+    return index.apply(df.copy())["_dinamizador_id"].tolist()
+
+
+def names(index, df):
+    col = index.apply(df.copy())["_nombre_unificado"].astype(object)
+    return col.where(col.notna(), None).tolist()
+
+
+@pytest.fixture
+def df():
+    return frame(ROWS)
+
+
+def test_variants_share_id_and_first_name(df):
+    index = IdentityIndex()
+    assert index.update(df) == len(df)
+    assert ids(index, df) == [0, 0, 1, pd.NA, 0]
+    assert names(index, df) == ["Ana Pérez", "Ana Pérez", "José Batista", None, "Ana Pérez"]
+    assert len(index) == 2
+
+
+def test_incremental_update_keeps_ids(df):
+    index = IdentityIndex()
+    index.update(df.iloc[:3])
+    before = ids(index, df.iloc[:3])
+    grown = frame(ROWS + [["7/10/2024 9:00:00", "3-700-12", "Marta Ortega"]])
+    assert index.update(grown) == len(grown) - 3  # solo las filas nuevas
+    assert ids(index, grown)[:3] == before
+    assert ids(index, grown)[-1] == 2
+
+
+def test_unchanged_sheet_processes_nothing(df):
+    index = IdentityIndex()
+    index.update(df)
+    assert index.update(df) == 0
+
+
+def test_persists_across_restarts(df, tmp_path):
+    first = IdentityIndex(tmp_path)
+    first.update(df)
+    expected = first.apply(df.copy())
+
+    restarted = IdentityIndex(tmp_path)
+    assert restarted.update(df) == 0
+    pd.testing.assert_frame_equal(restarted.apply(df.copy()), expected)
+
+
+def test_changed_last_row_reprocesses_and_keeps_ids(df):
+    index = IdentityIndex()
+    index.update(df)
+    edited = df.copy()
+    edited.loc[len(edited) - 1, "Nombre y apellido"] = "Ana M. Pérez"
+    assert index.update(edited) == len(edited)
+    assert ids(index, edited) == ids(index, df)
+
+
+def test_shorter_sheet_reprocesses(df):
+    index = IdentityIndex()
+    index.update(df)
+    assert index.update(df.iloc[:2]) == 2
+
+
+def test_earlier_response_changes_display_name(df):
+    index = IdentityIndex()
+    index.update(df)
+    late = frame(ROWS + [["1/1/2024 8:00:00", "8-123-456", "Ana María Pérez"]])
+    index.update(late)
+    assert ids(index, late)[-1] == 0
+    assert names(index, late)[0] == "Ana María Pérez"
+
+
+def test_responses_without_date_do_not_win_the_name():
+    index = IdentityIndex()
+    index.update(frame([["", "8-123-456", "Sin fecha"], ["3/10/2024 9:00:00", "8-123-456", "Ana Pérez"]]))
+    assert index.apply(frame([["", "8-123-456", ""]]))["_nombre_unificado"].tolist() == ["Ana Pérez"]
+
+
+def test_meta_out_of_step_keeps_ids_and_reprocesses(df, tmp_path):
+    IdentityIndex(tmp_path).update(df)
+    meta_path = tmp_path / META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["ids"] += 1  # como tras una escritura interrumpida
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    restarted = IdentityIndex(tmp_path)
+    assert restarted.update(df) == len(df)
+    assert ids(restarted, df) == [0, 0, 1, pd.NA, 0]
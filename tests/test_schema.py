@@ -0,0 +1,25 @@
+"""Conversión de tipos de `schema.apply_schema` con valores mal escritos o en otros formatos."""
+import pandas as pd
+
+from schema import apply_schema, parse_timestamp
+
+
+def test_out_of_range_years_become_null():
+    df = apply_schema(pd.DataFrame({"Año": ["2024", "202455", "1e6", "", "s/a", "2025.0"]}))
+    assert str(df["Año"].dtype) == "Int16"
+    assert df["Año"].tolist() == [2024, pd.NA, pd.NA, pd.NA, pd.NA, 2025]
+
+
+def test_timestamps_form_and_iso_formats():
+    parsed = parse_timestamp(pd.Series([
+        "3/10/2024 9:00:00",     # formulario: día/mes/año
+        "2024-10-03 09:00:00",   # ISO, como `FileSource` convierte las fechas de un Parquet
+        "2024-10-03T09:00:00",
+        "3/10/2024",             # formato libre: día primero
+        "",
+        "sin fecha",
+    ]))
+    expected = pd.Timestamp("2024-10-03 09:00:00")
+    assert parsed.iloc[:3].tolist() == [expected] * 3
+    assert parsed.iloc[3] == pd.Timestamp("2024-10-03")
+    assert parsed.iloc[4:].isna().all()
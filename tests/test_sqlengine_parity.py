@@ -0,0 +1,120 @@
+"""
+Paridad del motor SQL (`sqlengine.py`) con `reports.py` sobre respuestas fijas
+y pequeñas: celdas vacías, "Agregar al listado", selecciones completas y
+parciales, y el catálogo maestro de Participación por Infoplazas.
+
+La medición con un millón de filas está en bench/bench_engines.py.
+"""
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import reports
+from dataset import prepare_dataset
+from filters import filter_frame
+
+pytest.importorskip("duckdb")
+from sqlengine import DuckDBEngine  # noqa: E402
+
+COLUMNS = [
+    "Marca temporal", "Cédula", "Nombre y apellido", "Año", "Mes", "Regional", "Provincia",
+    "#", "INFOPLAZAS", "Infoplaza", "CountSesión", "Tema", "Facilitador",
+]
+ROWS = [
+    ["3/10/2024 9:00:00", "8-123-456", "Ana Pérez", "2024", "Octubre", "Regional Central", "Coclé",
+     "12", "Infoplaza Penonomé", "12 - Penonomé", "101", "Tema 01", "Luis Ríos"],
+    ["3/10/2024 9:05:00", "08-123-0456", "ana perez", "2024", "Octubre", "Regional Central", "Coclé",
+     "12", "Infoplaza Penonomé", "12 - Penonomé", "101", "Tema 01", "Luis Ríos"],
+    ["4/10/2024 10:00:00", "8-123-456", "Ana Pérez", "2024", "Octubre", "Regional Central", "Herrera",
+     "14", "Infoplaza Chitré", "14 - Chitré", "102", "Tema 02", "Agregar al listado"],
+    ["5/10/2024 11:00:00", "4-55-901", "José Batista", "2024", "Octubre", "Regional Occidental", "Chiriquí",
+     "30", "Infoplaza David", "30 - David", "103", "Tema 02", "Rosa Chen"],
+    ["", "4-55-901", "José Batista", "2024", "Noviembre", "Regional Occidental", "Chiriquí",
+     "30", "Infoplaza David", "30 - David", "104", "", "Rosa Chen"],
+    ["6/11/2024 8:30:00", "", "Sin Cédula", "2024", "Noviembre", "", "Chiriquí",
+     "30", "Infoplaza David", "30 - David", "104", "Tema 03", "Rosa Chen"],
+    ["7/11/2024 8:30:00", "s/n", "Marta Ortega", "2024", "Noviembre", "Regional Oriental", "Colón",
+     "41", "Infoplaza Colón", "41 - Colón", "105", "Tema 03", ""],
+    ["8/11/2024 14:00:00", "3-700-12", "Marta Ortega", "2025", "Enero", "Regional Oriental", "Colón",
+     "41", "Infoplaza Colón", "41 - Colón", "106", "Tema 04", "Agregar al listado"],
+    ["8/11/2024 14:00:00", "3-700-12", "Marta Ortega", "2025", "Enero", "Regional Oriental", "Darién",
+     "45", "Infoplaza La Palma", "45 - La Palma", "106", "Tema 04", "Luis Ríos"],
+    ["9/1/2025 9:00:00", "8-999-1", "Iván Moreno", "2025", "Enero", "Regional Metropolitana", "Panamá",
+     "2", "Infoplaza Calidonia", "2 - Calidonia", "107", "Tema 01", "Luis Ríos"],
+    # Infoplaza del catálogo sin participación en las selecciones parciales de Regional Central.
+    ["9/1/2025 9:30:00", "8-999-1", "Ivan Moreno", "2025", "Enero", "Regional Central", "Veraguas",
+     "20", "Infoplaza Santiago", "20 - Santiago", "107", "Tema 05", "Rosa Chen"],
+]
+
+
+@pytest.fixture(scope="module")
+def prepared():
+    df, filter_index, _ = prepare_dataset(pd.DataFrame(ROWS, columns=COLUMNS))
+    return df, filter_index, DuckDBEngine(df, filter_index, threads=1)
+
+
+def _plain(df):
+    """Mismos valores y orden sin depender del dtype (category frente a texto, Int frente a int)."""
+    df = df.reset_index(drop=True).astype(object)
+    return df.where(df.notna(), None)
+
+
+def _everything(filter_index):
+    return {col: list(entry["options"]) for col, entry in filter_index["columns"].items()}
+
+
+def _selections(filter_index):
+    everything = _everything(filter_index)
+    return {
+        "todo elegido": everything,
+        "sin selección": {},
+        "una regional": {**everything, "Regional": ["Regional Central"]},
+        "regional y provincia": {**everything, "Regional": ["Regional Central", "Regional Occidental"],
+                                 "Provincia": ["Coclé", "Chiriquí"]},
+        "un facilitador": {**everything, "Facilitador": ["Rosa Chen"]},
+        "año y mes": {**everything, "Año": [2025], "Mes": ["Enero"]},
+    }
+
+
+SELECTIONS = ["todo elegido", "sin selección", "una regional", "regional y provincia",
+              "un facilitador", "año y mes"]
+
+
+@pytest.mark.parametrize("name", SELECTIONS)
+def test_dinamizadores_and_top(prepared, name):
+    df, filter_index, engine = prepared
+    selections = _selections(filter_index)[name]
+    df_f = filter_frame(df, filter_index, selections)
+    assert_frame_equal(_plain(engine.dinamizadores_table(selections)), _plain(reports.dinamizadores_table(df_f)))
+    assert_frame_equal(_plain(engine.top_table(selections)), _plain(reports.top_table(df_f)))
+
+
+@pytest.mark.parametrize("name", SELECTIONS)
+def test_infoplazas(prepared, name):
+    df, filter_index, engine = prepared
+    selections = _selections(filter_index)[name]
+    expected = reports.infoplazas_tables(df, filter_frame(df, filter_index, selections), selections)
+    got = engine.infoplazas_tables(selections)
+    summary, detail, positions = got
+    assert_frame_equal(_plain(summary), _plain(expected[0]))
+    assert_frame_equal(_plain(detail), _plain(expected[1]))
+    assert {k: list(v) for k, v in positions.items()} == {k: list(v) for k, v in expected[2].items()}
+
+
+def test_catalog_keeps_infoplazas_without_participation(prepared):
+    df, filter_index, engine = prepared
+    selections = {**_everything(filter_index), "Regional": ["Regional Central"], "Facilitador": ["Luis Ríos"]}
+    summary = engine.infoplazas_tables(selections)[0]
+    expected = reports.infoplazas_tables(df, filter_frame(df, filter_index, selections), selections)[0]
+    assert_frame_equal(_plain(summary), _plain(expected))
+    santiago = summary.set_index("InfoplazaFull").loc["20 - Infoplaza Santiago"]
+    assert santiago["TotalSesiones"] == 0 and santiago["DinamizadoresUnicos"] == 0
+
+
+def test_no_rows(prepared):
+    df, filter_index, engine = prepared
+    selections = {**_everything(filter_index), "Año": [2025], "Mes": ["Octubre"]}
+    assert reports.infoplazas_tables(df, filter_frame(df, filter_index, selections), selections) is None
+    assert engine.infoplazas_tables(selections) is None
+    assert engine.dinamizadores_table(selections).empty
+    assert reports.dinamizadores_table(filter_frame(df, filter_index, selections)).empty